@@ -1,27 +1,393 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Cookie
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Response, Cookie, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import Int64
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, NamedTuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+import argparse
+import asyncio
+import base64
+import bisect
+import gzip
+import hashlib
+import heapq
+import hmac
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
 import uuid
 from datetime import datetime, timezone, timedelta
 import bcrypt
 import httpx
+import orjson
 from functools import wraps
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50)
+BYTES_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(label_names: tuple, label_values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def snapshot(self, *label_values) -> Optional[Dict[str, float]]:
+        with self._lock:
+            series = self._series.get(label_values)
+            return {"count": series[-2], "sum": series[-1]} if series else None
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = format_labels(self.label_names, label_values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = format_labels(self.label_names, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series[-2]}")
+                labels = format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {series[-1]}")
+                lines.append(f"{self.name}_count{labels} {series[-2]}")
+        return lines
+
+
+http_requests_total = Counter("http_requests_total", "HTTP requests by route and status", ("route", "status"))
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", LATENCY_BUCKETS, ("route",))
+http_request_db_commands = Histogram(
+    "http_request_db_commands", "MongoDB commands issued per request", COUNT_BUCKETS, ("route",))
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in MongoDB commands per request", LATENCY_BUCKETS, ("route",))
+http_response_bytes = Histogram(
+    "http_response_bytes", "Response body size", BYTES_BUCKETS, ("route",))
+http_request_executor_wait = Histogram(
+    "http_request_executor_wait_seconds", "Time spent queued for the bcrypt executor per request",
+    LATENCY_BUCKETS, ("route",))
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", LATENCY_BUCKETS, ("route", "command"))
+http_requests_shed_total = Counter(
+    "http_requests_shed_total", "Requests rejected before reaching a handler", ("route_class", "reason"))
+bcrypt_duration = Histogram(
+    "bcrypt_duration_seconds", "bcrypt hash/verify time excluding queue wait", LATENCY_BUCKETS, ("operation",))
+activity_events_dropped_total = Counter(
+    "activity_events_dropped_total", "Activity events the achievement engine never evaluated", ("kind", "reason"))
+
+METRICS = [
+    http_requests_total, http_request_duration, http_request_db_commands, http_request_db_seconds,
+    http_response_bytes, http_request_executor_wait, mongo_command_duration, bcrypt_duration,
+    http_requests_shed_total, activity_events_dropped_total,
+]
+
+
+class RequestStats:
+    __slots__ = ("db_commands", "db_seconds", "executor_wait", "response_bytes", "status", "commands")
+
+    def __init__(self):
+        self.db_commands = 0
+        self.db_seconds = 0.0
+        self.executor_wait = 0.0
+        self.response_bytes = 0
+        self.status = 500
+        self.commands: List[tuple] = []
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    def _record(self, event):
+        duration = event.duration_micros / 1_000_000
+        stats = current_request_stats.get()
+        if stats is None:
+            mongo_command_duration.observe(duration, "background", event.command_name)
+            return
+        stats.db_commands += 1
+        stats.db_seconds += duration
+        stats.commands.append((event.command_name, duration))
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started_at = time.perf_counter()
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                stats.status = message["status"]
+            elif message["type"] == "http.response.body":
+                stats.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            label = f"{scope['method']} {route.path if route else 'unmatched'}"
+            http_requests_total.inc(label, stats.status)
+            http_request_duration.observe(time.perf_counter() - started_at, label)
+            http_request_db_commands.observe(stats.db_commands, label)
+            http_request_db_seconds.observe(stats.db_seconds, label)
+            http_response_bytes.observe(stats.response_bytes, label)
+            http_request_executor_wait.observe(stats.executor_wait, label)
+            for command_name, duration in stats.commands:
+                mongo_command_duration.observe(duration, label, command_name)
+
+
+LOAD_SHED_MIN_LIMIT = int(os.environ.get('LOAD_SHED_MIN_LIMIT', '2'))
+LOAD_SHED_BACKOFF = float(os.environ.get('LOAD_SHED_BACKOFF', '0.9'))
+LOAD_SHED_RETRY_AFTER_SECONDS = int(os.environ.get('LOAD_SHED_RETRY_AFTER_SECONDS', '1'))
+# route class -> (initial concurrency limit, latency target in seconds)
+LOAD_SHED_CLASSES = {
+    "auth": (int(os.environ.get('LOAD_SHED_AUTH_LIMIT', '16')),
+             float(os.environ.get('LOAD_SHED_AUTH_TARGET_SECONDS', '1.0'))),
+    "write": (int(os.environ.get('LOAD_SHED_WRITE_LIMIT', '64')),
+              float(os.environ.get('LOAD_SHED_WRITE_TARGET_SECONDS', '0.25'))),
+    "read": (int(os.environ.get('LOAD_SHED_READ_LIMIT', '128')),
+             float(os.environ.get('LOAD_SHED_READ_TARGET_SECONDS', '0.1'))),
+}
+AUTH_RATE_PER_MINUTE = float(os.environ.get('AUTH_RATE_PER_MINUTE', '10'))
+AUTH_RATE_BURST = int(os.environ.get('AUTH_RATE_BURST', '5'))
+AUTH_RATE_MAX_CLIENTS = int(os.environ.get('AUTH_RATE_MAX_CLIENTS', '10000'))
+# Number of reverse proxies in front of the app that append to X-Forwarded-For. The deployment sits behind one
+# ingress, so the client is the last address it appended; set to 0 when the app is exposed directly.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '1'))
+RATE_LIMITED_PATHS = {"/api/auth/login", "/api/auth/register"}
+CATALOG_PATH_PREFIXES = ("/api/roadmaps", "/api/achievements", "/api/search")
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: grows by ~1 per window of fast responses, shrinks when latency passes the target."""
+
+    def __init__(self, limit: int, target_latency: float, min_limit: int, max_limit: int):
+        self.limit = float(limit)
+        self.target_latency = target_latency
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self._last_decrease = 0.0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float):
+        saturated = self.in_flight >= self.limit / 2
+        self.in_flight -= 1
+        if latency > self.target_latency:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * LOAD_SHED_BACKOFF)
+                self._last_decrease = now
+        elif saturated:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate_per_second: float, burst: int, max_clients: int):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple] = OrderedDict()
+
+    def acquire(self, key: str) -> float:
+        """Take a token for key; returns 0 if allowed, otherwise seconds until a token is available."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+concurrency_limiters = {
+    route_class: AdaptiveLimiter(limit, target, LOAD_SHED_MIN_LIMIT, limit * 4)
+    for route_class, (limit, target) in LOAD_SHED_CLASSES.items()
+}
+auth_rate_limiter = TokenBucketLimiter(AUTH_RATE_PER_MINUTE / 60, AUTH_RATE_BURST, AUTH_RATE_MAX_CLIENTS)
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    if not path.startswith("/api/") or method == "OPTIONS":
+        return None
+    if method == "POST" and path.startswith("/api/auth/") and path != "/api/auth/logout":
+        return "auth"
+    if method in ("GET", "HEAD"):
+        return None if path.startswith(CATALOG_PATH_PREFIXES) else "read"
+    return "write"
+
+
+def client_address(scope) -> str:
+    """Rate-limit key: the address our outermost trusted proxy saw, which the client cannot spoof."""
+    if TRUSTED_PROXY_HOPS > 0:
+        forwarded = [
+            address.strip()
+            for name, value in scope["headers"] if name == b"x-forwarded-for"
+            for address in value.decode("latin-1").split(",") if address.strip()
+        ]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        route_class = classify_request(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+        
+        if scope["path"] in RATE_LIMITED_PATHS:
+            wait = auth_rate_limiter.acquire(client_address(scope))
+            if wait > 0:
+                http_requests_shed_total.inc(route_class, "rate_limited")
+                await self._reject(scope, receive, send, 429, "Too many attempts, please retry later", wait)
+                return
+        
+        limiter = concurrency_limiters[route_class]
+        if not limiter.try_acquire():
+            http_requests_shed_total.inc(route_class, "overloaded")
+            await self._reject(scope, receive, send, 503, "Server busy, please retry", LOAD_SHED_RETRY_AFTER_SECONDS)
+            return
+        
+        started_at = time.perf_counter()
+        latency = None
+
+        async def send_timed(message):
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - started_at
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            limiter.release(latency if latency is not None else time.perf_counter() - started_at)
+
+    async def _reject(self, scope, receive, send, status_code: int, detail: str, retry_after: float):
+        response = JSONResponse(
+            status_code=status_code, content={"detail": detail},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, receive, send)
+
+
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandListener()])
 db = client[os.environ['DB_NAME']]
 
-app = FastAPI()
+
+def encode_json(content: Any) -> bytes:
+    return orjson.dumps(content, default=str)
+
+
+class FastJSONResponse(JSONResponse):
+    """Serializes with orjson; handlers return it directly to skip FastAPI's jsonable_encoder pass."""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -37,6 +403,7 @@ class User(BaseModel):
     xp: int = 0
     level: int = 1
     created_at: str
+    activity: Optional[Dict[str, int]] = Field(default=None, exclude=True)
 
 
 class UserCreate(BaseModel):
@@ -55,6 +422,7 @@ class RoadmapNode(BaseModel):
     label: str
     description: Optional[str] = None
     resources: List[Dict[str, str]] = []
+    prerequisites: List[str] = []
 
 
 class Roadmap(BaseModel):
@@ -65,6 +433,7 @@ class Roadmap(BaseModel):
     difficulty: str
     estimated_time: str
     nodes: List[RoadmapNode]
+    node_bits: Dict[str, int] = {}
     created_at: str
 
 
@@ -73,6 +442,7 @@ class UserProgress(BaseModel):
     progress_id: str
     user_id: str
     roadmap_id: str
+    completed_mask: int = 0
     completed_nodes: List[str] = []
     progress_percentage: float = 0.0
     last_updated: str
@@ -95,64 +465,1181 @@ class UserAchievement(BaseModel):
     earned_at: str
 
 
-async def get_current_user(request: Request):
+SESSION_CACHE_TTL_SECONDS = float(os.environ.get('SESSION_CACHE_TTL_SECONDS', '60'))
+SESSION_CACHE_MAX_SIZE = int(os.environ.get('SESSION_CACHE_MAX_SIZE', '10000'))
+
+
+class SessionCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[str, set] = {}
+
+    def get(self, session_token: str) -> Optional[User]:
+        entry = self._entries.get(session_token)
+        if entry is None:
+            return None
+        stale_at, expires_at, user = entry
+        if stale_at < time.monotonic() or expires_at < datetime.now(timezone.utc):
+            self.invalidate(session_token)
+            return None
+        self._entries.move_to_end(session_token)
+        return user
+
+    def put(self, session_token: str, user: User, expires_at: datetime):
+        if self.max_size <= 0:
+            return
+        self.invalidate(session_token)
+        self._entries[session_token] = (time.monotonic() + self.ttl, expires_at, user)
+        self._tokens_by_user.setdefault(user.user_id, set()).add(session_token)
+        while len(self._entries) > self.max_size:
+            oldest_token = next(iter(self._entries))
+            self.invalidate(oldest_token)
+
+    def invalidate(self, session_token: str):
+        entry = self._entries.pop(session_token, None)
+        if entry is None:
+            return
+        user_id = entry[2].user_id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(session_token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def refresh_user(self, user_doc: Dict[str, Any]):
+        tokens = self._tokens_by_user.get(user_doc["user_id"])
+        if not tokens:
+            return
+        user = User(**user_doc)
+        for token in tokens:
+            stale_at, expires_at, _ = self._entries[token]
+            self._entries[token] = (stale_at, expires_at, user)
+
+
+session_cache = SessionCache(SESSION_CACHE_MAX_SIZE, SESSION_CACHE_TTL_SECONDS)
+
+
+SESSION_TTL = timedelta(days=7)
+SESSION_SIGNING_KEY = os.environ.get('SESSION_SIGNING_KEY', '').encode('utf-8')
+SIGNED_TOKEN_PREFIX = "st1."
+REVOCATION_REFRESH_SECONDS = float(os.environ.get('REVOCATION_REFRESH_SECONDS', '30'))
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def sign_session_token(user_id: str, expires_at: datetime) -> str:
+    payload = b64url_encode(json.dumps(
+        {"uid": user_id, "exp": int(expires_at.timestamp()), "sid": uuid.uuid4().hex[:16]},
+        separators=(",", ":")
+    ).encode("utf-8"))
+    signature = b64url_encode(hmac.new(SESSION_SIGNING_KEY, payload.encode("ascii"), hashlib.sha256).digest())
+    return f"{SIGNED_TOKEN_PREFIX}{payload}.{signature}"
+
+
+def decode_signed_token(session_token: str) -> Optional[Dict[str, Any]]:
+    if not SESSION_SIGNING_KEY:
+        return None
+    payload, _, signature = session_token[len(SIGNED_TOKEN_PREFIX):].partition(".")
+    expected = b64url_encode(hmac.new(SESSION_SIGNING_KEY, payload.encode("ascii", "replace"), hashlib.sha256).digest())
+    if not hmac.compare_digest(signature.encode("ascii", "replace"), expected.encode("ascii")):
+        return None
+    try:
+        claims = json.loads(b64url_decode(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or not {"uid", "exp", "sid"} <= claims.keys():
+        return None
+    return claims
+
+
+class RevokedSessions:
+    def __init__(self):
+        self._expiry_by_sid: Dict[str, float] = {}
+        self._synced_at: Optional[datetime] = None
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._expiry_by_sid
+
+    def __len__(self) -> int:
+        return len(self._expiry_by_sid)
+
+    async def revoke(self, sid: str, expires_at: int):
+        self._expiry_by_sid[sid] = expires_at
+        await db.revoked_sessions.update_one(
+            {"sid": sid},
+            {"$setOnInsert": {
+                "expires_at": datetime.fromtimestamp(expires_at, timezone.utc),
+                "revoked_at": datetime.now(timezone.utc)
+            }},
+            upsert=True
+        )
+
+    async def refresh(self):
+        now = datetime.now(timezone.utc)
+        query = {"expires_at": {"$gt": now}}
+        if self._synced_at is not None:
+            query["revoked_at"] = {"$gte": self._synced_at - timedelta(seconds=REVOCATION_REFRESH_SECONDS)}
+        async for doc in db.revoked_sessions.find(query, {"_id": 0, "sid": 1, "expires_at": 1}):
+            expires_at = doc["expires_at"]
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            self._expiry_by_sid[doc["sid"]] = expires_at.timestamp()
+        self._expiry_by_sid = {
+            sid: expires_at for sid, expires_at in self._expiry_by_sid.items() if expires_at > now.timestamp()
+        }
+        self._synced_at = now
+
+
+revoked_sessions = RevokedSessions()
+
+
+async def refresh_revoked_sessions_periodically():
+    while True:
+        try:
+            await revoked_sessions.refresh()
+        except Exception:
+            logger.exception("Revoked session refresh failed")
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
+
+
+async def create_session(user_id: str, session_token: Optional[str] = None) -> str:
+    expires_at = datetime.now(timezone.utc) + SESSION_TTL
+    if SESSION_SIGNING_KEY:
+        return sign_session_token(user_id, expires_at)
+    
+    session_token = session_token or f"session_{uuid.uuid4().hex}"
+    await db.user_sessions.update_one(
+        {"session_token": session_token},
+        {
+            "$set": {"user_id": user_id, "expires_at": expires_at},
+            "$setOnInsert": {"created_at": datetime.now(timezone.utc)}
+        },
+        upsert=True
+    )
+    return session_token
+
+
+def get_session_token(request: Request) -> Optional[str]:
     session_token = request.cookies.get("session_token")
     if not session_token:
         auth_header = request.headers.get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             session_token = auth_header.split(" ")[1]
-    
+    return session_token
+
+
+async def get_current_user(request: Request):
+    session_token = get_session_token(request)
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    session_doc = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
-    if not session_doc:
-        raise HTTPException(status_code=401, detail="Invalid session")
+    claims = None
+    if session_token.startswith(SIGNED_TOKEN_PREFIX):
+        claims = decode_signed_token(session_token)
+        if claims is None or claims["sid"] in revoked_sessions:
+            session_cache.invalidate(session_token)
+            raise HTTPException(status_code=401, detail="Invalid session")
+    
+    cached_user = session_cache.get(session_token)
+    if cached_user is not None:
+        return cached_user
+    
+    if claims is not None:
+        user_id = claims["uid"]
+        expires_at = datetime.fromtimestamp(claims["exp"], timezone.utc)
+    else:
+        session_doc = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
+        if not session_doc:
+            raise HTTPException(status_code=401, detail="Invalid session")
+        user_id = session_doc["user_id"]
+        expires_at = session_doc["expires_at"]
+        if isinstance(expires_at, str):
+            expires_at = datetime.fromisoformat(expires_at)
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
     
-    expires_at = session_doc["expires_at"]
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
     if expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=401, detail="Session expired")
     
-    user_doc = await db.users.find_one({"user_id": session_doc["user_id"]}, {"_id": 0})
+    user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0})
     if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return User(**user_doc)
+    user = User(**user_doc)
+    session_cache.put(session_token, user, expires_at)
+    return user
+
+
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', str(os.cpu_count() or 2)))
+BCRYPT_MAX_QUEUE = int(os.environ.get('BCRYPT_MAX_QUEUE', '64'))
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.pending = 0
+        self.last_queue_wait = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.pending,
+            "queue_depth": self.queue_depth,
+            "last_queue_wait": self.last_queue_wait,
+        }
+
+    async def _run(self, operation: str, fn, *args):
+        if self.queue_depth >= self.max_queue:
+            raise HTTPException(
+                status_code=503, detail="Server busy, please retry",
+                headers={"Retry-After": str(LOAD_SHED_RETRY_AFTER_SECONDS)}
+            )
+        stats = current_request_stats.get()
+        submitted_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            self.last_queue_wait = started_at - submitted_at
+            if stats is not None:
+                stats.executor_wait += self.last_queue_wait
+            try:
+                return fn(*args)
+            finally:
+                bcrypt_duration.observe(time.perf_counter() - started_at, operation)
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run("hash", bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt())
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run("verify", bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(BCRYPT_WORKERS, BCRYPT_MAX_QUEUE)
+
+
+XP_PER_NODE = 10
+
+LEVEL_FROM_XP = {"$max": [1, {"$add": [{"$toInt": {"$floor": {"$divide": ["$xp", 100]}}}, 1]}]}
 
 
 def calculate_level_from_xp(xp: int) -> int:
     return max(1, int(xp / 100) + 1)
 
 
-async def award_achievement(user_id: str, achievement_id: str):
-    existing = await db.user_achievements.find_one({"user_id": user_id, "achievement_id": achievement_id}, {"_id": 0})
-    if existing:
-        return
-    
-    achievement_doc = await db.achievements.find_one({"achievement_id": achievement_id}, {"_id": 0})
-    if not achievement_doc:
-        return
-    
-    user_achievement_id = f"ua_{uuid.uuid4().hex[:12]}"
-    await db.user_achievements.insert_one({
-        "user_achievement_id": user_achievement_id,
-        "user_id": user_id,
-        "achievement_id": achievement_id,
-        "earned_at": datetime.now(timezone.utc).isoformat()
-    })
+LEADERBOARD_MAX_XP = int(os.environ.get('LEADERBOARD_MAX_XP', str(1 << 20)))
+# Each worker keeps its own ranking: grants it serves update it immediately, grants served by other workers only
+# show up after its next rebuild, so ranks can lag by up to LEADERBOARD_REBUILD_SECONDS across workers.
+LEADERBOARD_REBUILD_SECONDS = float(os.environ.get('LEADERBOARD_REBUILD_SECONDS', '600'))
+
+
+class XpRanking:
+    def __init__(self, max_xp: int = LEADERBOARD_MAX_XP):
+        self.max_xp = max_xp
+        self.ready = False
+        self._pending: Optional[Dict[str, Optional[int]]] = None
+        self._xp_by_user: Dict[str, int] = {}
+        self._capacity = 1024
+        self._tree = [0] * (self._capacity + 1)
+
+    def __len__(self) -> int:
+        return len(self._xp_by_user)
+
+    def _clamp(self, xp: Optional[int]) -> int:
+        return min(max(int(xp or 0), 0), self.max_xp)
+
+    def _grow(self, xp: int):
+        while xp >= self._capacity:
+            total = self._count_at_most(self._capacity - 1)
+            self._tree.extend([0] * self._capacity)
+            self._capacity *= 2
+            self._tree[self._capacity] = total
+
+    def _add(self, xp: int, delta: int):
+        i = xp + 1
+        while i <= self._capacity:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_at_most(self, xp: int) -> int:
+        i = min(xp + 1, self._capacity)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def update(self, user_id: str, xp: Optional[int]):
+        xp = self._clamp(xp)
+        if self._pending is not None:
+            self._pending[user_id] = xp
+        previous = self._xp_by_user.get(user_id)
+        if previous == xp:
+            return
+        if previous is not None:
+            self._add(previous, -1)
+        self._grow(xp)
+        self._xp_by_user[user_id] = xp
+        self._add(xp, 1)
+
+    def remove(self, user_id: str):
+        if self._pending is not None:
+            self._pending[user_id] = None
+        previous = self._xp_by_user.pop(user_id, None)
+        if previous is not None:
+            self._add(previous, -1)
+
+    def rank(self, xp: Optional[int]) -> int:
+        return len(self._xp_by_user) - self._count_at_most(self._clamp(xp)) + 1
+
+    def begin_rebuild(self):
+        self._pending = {}
+
+    def abort_rebuild(self):
+        self._pending = None
+
+    def build(self, entries) -> tuple:
+        """Builds a snapshot without touching the live tree, so it can run in an executor thread."""
+        xp_by_user = {user_id: self._clamp(xp) for user_id, xp in entries}
+        capacity = 1024
+        highest = max(xp_by_user.values(), default=0)
+        while highest >= capacity:
+            capacity *= 2
+        tree = [0] * (capacity + 1)
+        for xp in xp_by_user.values():
+            tree[xp + 1] += 1
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+        return xp_by_user, capacity, tree
+
+    def install(self, snapshot: tuple):
+        """Swaps in a snapshot, then replays updates recorded since begin_rebuild so none are lost."""
+        self._xp_by_user, self._capacity, self._tree = snapshot
+        pending, self._pending = self._pending or {}, None
+        for user_id, xp in pending.items():
+            if xp is None:
+                self.remove(user_id)
+            else:
+                self.update(user_id, xp)
+        self.ready = True
+
+    def rebuild(self, entries):
+        self.begin_rebuild()
+        self.install(self.build(entries))
+
+
+xp_ranking = XpRanking()
+
+
+async def rebuild_xp_ranking():
+    started_at = time.perf_counter()
+    xp_ranking.begin_rebuild()
+    try:
+        entries = []
+        async for doc in db.users.find({}, {"_id": 0, "user_id": 1, "xp": 1}).batch_size(10000):
+            entries.append((doc["user_id"], doc.get("xp", 0)))
+        snapshot = await asyncio.get_running_loop().run_in_executor(None, xp_ranking.build, entries)
+    except BaseException:
+        xp_ranking.abort_rebuild()
+        raise
+    xp_ranking.install(snapshot)
+    logger.info(f"Rebuilt XP ranking for {len(entries)} users in {time.perf_counter() - started_at:.2f}s")
+
+
+async def rebuild_xp_ranking_periodically():
+    while True:
+        try:
+            await rebuild_xp_ranking()
+        except Exception:
+            logger.exception("XP ranking rebuild failed")
+        await asyncio.sleep(LEADERBOARD_REBUILD_SECONDS)
+
+
+ACTIVITY_WINDOW_DAYS = 32
+
+
+def epoch_day(moment: datetime) -> int:
+    return int(moment.timestamp() // 86400)
+
+
+def record_activity_stages(day: int) -> List[Dict[str, Any]]:
+    last_day = {"$ifNull": ["$activity.last_day", day - ACTIVITY_WINDOW_DAYS]}
+    bits = {"$ifNull": ["$activity.bits", 0]}
+    streak = {"$ifNull": ["$activity.streak", 0]}
+    return [
+        {"$set": {"_activity_gap": {"$subtract": [day, last_day]}}},
+        {"$set": {
+            "activity.bits": {"$switch": {
+                "branches": [
+                    {"case": {"$lte": ["$_activity_gap", 0]}, "then": {"$max": [bits, 1]}},
+                    {"case": {"$gte": ["$_activity_gap", ACTIVITY_WINDOW_DAYS]}, "then": 1},
+                ],
+                "default": {"$add": [
+                    {"$toLong": {"$mod": [{"$multiply": [bits, {"$pow": [2, "$_activity_gap"]}]}, 2 ** ACTIVITY_WINDOW_DAYS]}},
+                    1
+                ]}
+            }},
+            "activity.streak": {"$switch": {
+                "branches": [
+                    {"case": {"$lte": ["$_activity_gap", 0]}, "then": {"$max": [streak, 1]}},
+                    {"case": {"$eq": ["$_activity_gap", 1]}, "then": {"$add": [streak, 1]}},
+                ],
+                "default": 1
+            }},
+            "activity.last_day": {"$max": [day, last_day]},
+        }},
+        {"$set": {"activity.longest_streak": {"$max": [{"$ifNull": ["$activity.longest_streak", 0]}, "$activity.streak"]}}},
+        {"$unset": "_activity_gap"},
+    ]
+
+
+def activity_summary(activity: Optional[Dict[str, int]], today: Optional[int] = None) -> Dict[str, Any]:
+    if not activity or "last_day" not in activity:
+        return {"current_streak": 0, "longest_streak": 0, "last_active_day": None,
+                "active_days_last_7": 0, "active_days_last_30": 0}
     
-    await db.users.update_one(
+    today = epoch_day(datetime.now(timezone.utc)) if today is None else today
+    gap = max(0, today - activity["last_day"])
+    bits = (activity.get("bits", 0) << gap) & ((1 << ACTIVITY_WINDOW_DAYS) - 1) if gap < ACTIVITY_WINDOW_DAYS else 0
+    return {
+        "current_streak": activity.get("streak", 0) if gap <= 1 else 0,
+        "longest_streak": activity.get("longest_streak", 0),
+        "last_active_day": datetime.fromtimestamp(activity["last_day"] * 86400, timezone.utc).date().isoformat(),
+        "active_days_last_7": (bits & ((1 << 7) - 1)).bit_count(),
+        "active_days_last_30": (bits & ((1 << 30) - 1)).bit_count(),
+    }
+
+
+def user_payload(user: User) -> Dict[str, Any]:
+    return {**user.model_dump(), "streak": activity_summary(user.activity)}
+
+
+async def grant_xp(user_id: str, amount: int, activity_day: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    activity_stages = record_activity_stages(activity_day) if activity_day is not None else []
+    user_doc = await db.users.find_one_and_update(
         {"user_id": user_id},
-        {"$inc": {"xp": achievement_doc["xp_reward"]}}
+        [
+            {"$set": {"xp": {"$add": [{"$ifNull": ["$xp", 0]}, amount]}}},
+            {"$set": {"level": LEVEL_FROM_XP}},
+            *activity_stages,
+        ],
+        projection={"_id": 0, "password_hash": 0},
+        return_document=ReturnDocument.AFTER
     )
+    if user_doc:
+        session_cache.refresh_user(user_doc)
+        xp_ranking.update(user_id, user_doc.get("xp", 0))
+    return user_doc
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(key: str) -> str:
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> str:
+    try:
+        key = base64.b64decode(token + "=" * (-len(token) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Only tokens encode_cursor could have produced; anything else would silently restart pagination.
+    if not key or encode_cursor(key) != token:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("Accept", "")
+
+
+async def paginated_find(request: Request, collection, query: Dict[str, Any], projection: Dict[str, Any],
+                         key: str, limit: Optional[int], after: Optional[str], transform=None) -> Response:
+    if after:
+        query = {**query, key: {"$gt": decode_cursor(after)}}
+    cursor = collection.find(query, projection).sort(key, ASCENDING)
     
-    user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0})
-    new_level = calculate_level_from_xp(user_doc["xp"])
-    await db.users.update_one({"user_id": user_id}, {"$set": {"level": new_level}})
+    if wants_ndjson(request):
+        if limit:
+            cursor = cursor.limit(limit)
+        
+        async def stream_lines():
+            async for doc in cursor:
+                item = transform(doc) if transform else doc
+                if item is not None:
+                    yield encode_json(item) + b"\n"
+        
+        return StreamingResponse(stream_lines(), media_type=NDJSON_MEDIA_TYPE)
+    
+    page_size = limit or DEFAULT_PAGE_SIZE
+    docs = await cursor.limit(page_size + 1).to_list(page_size + 1)
+    headers = {}
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        headers["X-Next-Cursor"] = encode_cursor(docs[-1][key])
+    
+    items = [transform(doc) for doc in docs] if transform else docs
+    return FastJSONResponse(content=[item for item in items if item is not None], headers=headers)
+
+
+CATALOG_REFRESH_SECONDS = float(os.environ.get('CATALOG_REFRESH_SECONDS', '300'))
+CATALOG_KEYS = {"roadmaps": "roadmap_id", "achievements": "achievement_id"}
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return {}
+    encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=11)
+    return encoded
+
+
+def negotiate_encoding(accept_encoding: str, available: Dict[str, bytes]) -> Optional[str]:
+    preferences = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        preferences[coding.strip().lower()] = quality
+    
+    best, best_quality = None, 0.0
+    for coding in ("br", "gzip"):
+        quality = preferences.get(coding, preferences.get("*", 0.0))
+        if coding in available and quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+# completed_mask is a signed 64-bit int, so a roadmap can hand out at most 63 node bits over its lifetime.
+MAX_ROADMAP_NODES = 63
+
+
+def stored_node_bits(roadmap_doc: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    if not roadmap_doc:
+        return {}
+    if "node_bits" in roadmap_doc:
+        return dict(roadmap_doc["node_bits"])
+    # Masks written before node_bits existed used the node's position in the stored document.
+    return {node["id"]: index for index, node in enumerate(roadmap_doc.get("nodes", []))}
+
+
+def assign_node_bits(roadmap_id: str, node_bits: Dict[str, int], node_ids: List[str]) -> Dict[str, int]:
+    """Give new nodes the next unused bits; existing and retired nodes keep theirs, so bits are never reused."""
+    assigned = dict(node_bits)
+    next_bit = max(assigned.values(), default=-1) + 1
+    for node_id in node_ids:
+        if node_id not in assigned:
+            assigned[node_id] = next_bit
+            next_bit += 1
+    if next_bit > MAX_ROADMAP_NODES:
+        raise ValueError(f"Roadmap {roadmap_id} needs more than {MAX_ROADMAP_NODES} node bits")
+    return assigned
+
+
+def validate_node_bits(roadmap_id: str, node_bits: Dict[str, int], node_ids: List[str],
+                       previous: Dict[str, int]):
+    missing = [node_id for node_id in node_ids if node_id not in node_bits]
+    if missing:
+        raise ValueError(f"Roadmap {roadmap_id} has no node bit for {', '.join(missing)}")
+    bits = list(node_bits.values())
+    if len(set(bits)) != len(bits) or any(not 0 <= bit < MAX_ROADMAP_NODES for bit in bits):
+        raise ValueError(f"Roadmap {roadmap_id} has duplicate or out-of-range node bits")
+    changed = [node_id for node_id, bit in previous.items() if node_bits.get(node_id) != bit]
+    if changed:
+        raise ValueError(f"Roadmap {roadmap_id} changed the bit of existing nodes {', '.join(changed)}")
+
+
+def build_prerequisite_dag(roadmap_id: str, nodes: List[RoadmapNode], node_bits: Dict[str, int]) -> tuple:
+    indexes = {node.id: index for index, node in enumerate(nodes)}
+    prerequisite_masks = [0] * len(nodes)
+    dependents: List[List[int]] = [[] for _ in nodes]
+    for index, node in enumerate(nodes):
+        for prerequisite in node.prerequisites:
+            if prerequisite not in indexes:
+                raise ValueError(f"Roadmap {roadmap_id} node {node.id} requires unknown node {prerequisite}")
+            prerequisite_masks[index] |= 1 << node_bits[prerequisite]
+            dependents[indexes[prerequisite]].append(index)
+    
+    remaining = [mask.bit_count() for mask in prerequisite_masks]
+    ready = [index for index, count in enumerate(remaining) if count == 0]
+    order = []
+    while ready:
+        index = ready.pop(0)
+        order.append(index)
+        for dependent in dependents[index]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    if len(order) != len(nodes):
+        cyclic = [nodes[index].id for index, count in enumerate(remaining) if count > 0]
+        raise ValueError(f"Roadmap {roadmap_id} has a prerequisite cycle through {', '.join(cyclic)}")
+    return order, prerequisite_masks
+
+
+SEARCH_FIELD_WEIGHTS = {
+    "roadmap_title": 5.0,
+    "roadmap_description": 2.0,
+    "node_label": 4.0,
+    "node_description": 1.5,
+    "resource_title": 1.0,
+}
+SEARCH_PREFIX_WEIGHT = 0.5
+SEARCH_MAX_EXPANSIONS = 64
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SEARCH_TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return SEARCH_TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """Inverted index over roadmaps and their nodes; a node's resource titles count towards the node."""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[tuple, float]] = {}
+        self._vocabulary: List[str] = []
+        self._documents: Dict[tuple, Dict[str, Any]] = {}
+        self._roadmap_terms: Dict[str, Dict[str, Dict[tuple, float]]] = {}
+        self._roadmap_documents: Dict[str, List[tuple]] = {}
+        self._versions: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def sync(self, roadmaps: Dict[str, Dict[str, Any]], versions: Dict[str, str]) -> int:
+        """Re-index only the roadmaps whose version changed; returns how many were touched."""
+        changed = 0
+        for roadmap_id in [roadmap_id for roadmap_id in self._versions if roadmap_id not in roadmaps]:
+            self._remove(roadmap_id)
+            changed += 1
+        for roadmap_id, roadmap in roadmaps.items():
+            if self._versions.get(roadmap_id) != versions[roadmap_id]:
+                self._remove(roadmap_id)
+                self._add(roadmap, versions[roadmap_id])
+                changed += 1
+        return changed
+
+    def _add(self, roadmap: Dict[str, Any], version: str):
+        roadmap_id = roadmap["roadmap_id"]
+        terms: Dict[str, Dict[tuple, float]] = {}
+
+        def index(doc_key: tuple, text: Optional[str], field: str):
+            for token in tokenize(text):
+                scores = terms.setdefault(token, {})
+                scores[doc_key] = scores.get(doc_key, 0.0) + SEARCH_FIELD_WEIGHTS[field]
+
+        roadmap_key = (roadmap_id, "")
+        documents = {roadmap_key: {
+            "type": "roadmap", "roadmap_id": roadmap_id, "roadmap_title": roadmap.get("title"),
+            "description": roadmap.get("description"),
+        }}
+        index(roadmap_key, roadmap.get("title"), "roadmap_title")
+        index(roadmap_key, roadmap.get("description"), "roadmap_description")
+        for node in roadmap.get("nodes", []):
+            node_key = (roadmap_id, node["id"])
+            documents[node_key] = {
+                "type": "node", "roadmap_id": roadmap_id, "roadmap_title": roadmap.get("title"),
+                "node_id": node["id"], "label": node.get("label"), "description": node.get("description"),
+            }
+            index(node_key, node.get("label"), "node_label")
+            index(node_key, node.get("description"), "node_description")
+            for resource in node.get("resources", []):
+                index(node_key, resource.get("title"), "resource_title")
+        
+        for term, scores in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings.update(scores)
+        self._documents.update(documents)
+        self._roadmap_terms[roadmap_id] = terms
+        self._roadmap_documents[roadmap_id] = list(documents)
+        self._versions[roadmap_id] = version
+
+    def _remove(self, roadmap_id: str):
+        for term, scores in self._roadmap_terms.pop(roadmap_id, {}).items():
+            postings = self._postings[term]
+            for doc_key in scores:
+                del postings[doc_key]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+        for doc_key in self._roadmap_documents.pop(roadmap_id, []):
+            del self._documents[doc_key]
+        self._versions.pop(roadmap_id, None)
+
+    def _match(self, token: str) -> Dict[tuple, float]:
+        matches: Dict[tuple, float] = {}
+        start = bisect.bisect_left(self._vocabulary, token)
+        for position in range(start, min(start + SEARCH_MAX_EXPANSIONS, len(self._vocabulary))):
+            term = self._vocabulary[position]
+            if not term.startswith(token):
+                break
+            postings = self._postings[term]
+            weight = math.log(1 + len(self._documents) / len(postings))
+            if term != token:
+                weight *= SEARCH_PREFIX_WEIGHT
+            for doc_key, score in postings.items():
+                score *= weight
+                if score > matches.get(doc_key, 0.0):
+                    matches[doc_key] = score
+        return matches
+
+    def search(self, query: str, limit: int = SEARCH_DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """Every query token must match a term exactly or as a prefix; scores add up across tokens."""
+        totals: Optional[Dict[tuple, float]] = None
+        for token in dict.fromkeys(tokenize(query)):
+            matches = self._match(token)
+            totals = matches if totals is None else {
+                doc_key: totals[doc_key] + score for doc_key, score in matches.items() if doc_key in totals
+            }
+            if not totals:
+                return []
+        if not totals:
+            return []
+        
+        ranked = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+        return [{**self._documents[doc_key], "score": round(score, 3)} for doc_key, score in ranked]
+
+
+search_index = SearchIndex()
+
+
+class CatalogStore:
+    def __init__(self):
+        self.version: Optional[str] = None
+        self.roadmaps: Dict[str, Dict[str, Any]] = {}
+        self.achievements: Dict[str, Dict[str, Any]] = {}
+        self.node_ids: Dict[str, List[str]] = {}
+        self.node_indexes: Dict[str, Dict[str, int]] = {}
+        self.node_bits: Dict[str, Dict[str, int]] = {}
+        self.node_masks: Dict[str, int] = {}
+        self.topological_orders: Dict[str, List[int]] = {}
+        self.prerequisite_masks: Dict[str, List[int]] = {}
+        self._bodies: Dict[str, tuple] = {}
+
+    async def load(self) -> bool:
+        roadmaps = await db.roadmaps.find({}, {"_id": 0}).to_list(None)
+        achievements = await db.achievements.find({}, {"_id": 0}).to_list(None)
+        # node_bits is the storage layout of completed_mask, not part of the public roadmap shape.
+        stored_bits = {roadmap["roadmap_id"]: roadmap.pop("node_bits", {}) for roadmap in roadmaps}
+        
+        bodies = {
+            "roadmaps": encode_json(roadmaps),
+            "achievements": encode_json(achievements),
+        }
+        for roadmap in roadmaps:
+            bodies[f"roadmap:{roadmap['roadmap_id']}"] = encode_json(roadmap)
+        
+        version = hashlib.sha256(
+            bodies["roadmaps"] + bodies["achievements"] + encode_json(stored_bits)
+        ).hexdigest()[:16]
+        if version == self.version:
+            return False
+        
+        node_ids, node_bits, topological_orders, prerequisite_masks = {}, {}, {}, {}
+        for roadmap in roadmaps:
+            roadmap_id = roadmap["roadmap_id"]
+            nodes = [RoadmapNode(**node) for node in roadmap["nodes"]]
+            ids = [node.id for node in nodes]
+            if len(set(ids)) != len(ids):
+                raise ValueError(f"Roadmap {roadmap_id} has duplicate node ids")
+            bits = stored_bits[roadmap_id]
+            validate_node_bits(roadmap_id, bits, ids, self.node_bits.get(roadmap_id, {}))
+            node_ids[roadmap_id] = ids
+            node_bits[roadmap_id] = bits
+            topological_orders[roadmap_id], prerequisite_masks[roadmap_id] = \
+                build_prerequisite_dag(roadmap_id, nodes, bits)
+        
+        self.roadmaps = {r["roadmap_id"]: r for r in roadmaps}
+        self.achievements = {a["achievement_id"]: a for a in achievements}
+        self.node_ids = node_ids
+        self.node_bits = node_bits
+        self.topological_orders = topological_orders
+        self.prerequisite_masks = prerequisite_masks
+        self.node_indexes = {
+            roadmap_id: {node_id: node_bits[roadmap_id][node_id] for node_id in ids}
+            for roadmap_id, ids in node_ids.items()
+        }
+        self.node_masks = {
+            roadmap_id: sum(1 << bit for bit in indexes.values())
+            for roadmap_id, indexes in self.node_indexes.items()
+        }
+        self._bodies = {
+            key: (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"', precompress(body))
+            for key, body in bodies.items()
+        }
+        self.version = version
+        reindexed = search_index.sync(self.roadmaps, {
+            roadmap_id: self._bodies[f"roadmap:{roadmap_id}"][1] for roadmap_id in self.roadmaps
+        })
+        logger.info(f"Loaded catalog version {version} (re-indexed {reindexed} roadmaps for search)")
+        return True
+
+    def mask_from_node_ids(self, roadmap_id: str, completed_nodes: List[str]) -> int:
+        bits = self.node_bits.get(roadmap_id, {})
+        return sum(1 << bits[node_id] for node_id in set(completed_nodes) if node_id in bits)
+
+    def completed_mask(self, roadmap_id: str, progress_doc: Optional[Dict[str, Any]]) -> int:
+        if not progress_doc:
+            return 0
+        mask = progress_doc.get("completed_mask")
+        if mask is None:
+            mask = self.mask_from_node_ids(roadmap_id, progress_doc.get("completed_nodes", []))
+        return mask
+
+    def next_available(self, roadmap_id: str, mask: int) -> List[int]:
+        prerequisite_masks = self.prerequisite_masks[roadmap_id]
+        indexes = self.node_indexes[roadmap_id]
+        node_ids = self.node_ids[roadmap_id]
+        return [
+            index for index in self.topological_orders[roadmap_id]
+            if not mask >> indexes[node_ids[index]] & 1 and not prerequisite_masks[index] & ~mask
+        ]
+
+    def progress_view(self, progress_doc: Dict[str, Any]) -> Dict[str, Any]:
+        roadmap_id = progress_doc["roadmap_id"]
+        node_ids = self.node_ids.get(roadmap_id, [])
+        indexes = self.node_indexes.get(roadmap_id, {})
+        mask = self.completed_mask(roadmap_id, progress_doc)
+        view = {key: value for key, value in progress_doc.items() if key != "completed_mask"}
+        view["completed_nodes"] = [node_id for node_id in node_ids if mask >> indexes[node_id] & 1]
+        view["progress_percentage"] = (len(view["completed_nodes"]) / len(node_ids)) * 100 if node_ids else 0.0
+        return view
+
+    def response(self, request: Request, key: str) -> Response:
+        body, etag, encoded = self._bodies[key]
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""), encoded)
+        if encoding:
+            body = encoded[encoding]
+            headers["ETag"] = etag = f'{etag[:-1]}-{encoding}"'
+            headers["Content-Encoding"] = encoding
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if etag in candidates or "*" in candidates:
+                return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def listing(self, request: Request, kind: str, limit: Optional[int], after: Optional[str]) -> Response:
+        streaming = wants_ndjson(request)
+        if limit is None and after is None and not streaming:
+            return self.response(request, kind)
+        
+        key = CATALOG_KEYS[kind]
+        items = sorted((self.roadmaps if kind == "roadmaps" else self.achievements).values(), key=lambda item: item[key])
+        start = 0
+        if after is not None:
+            start = bisect.bisect_right([item[key] for item in items], decode_cursor(after))
+        
+        if streaming:
+            page = items[start:start + limit] if limit else items[start:]
+            return StreamingResponse(
+                iter([encode_json(item) + b"\n" for item in page]),
+                media_type=NDJSON_MEDIA_TYPE
+            )
+        
+        page_size = limit or DEFAULT_PAGE_SIZE
+        page = items[start:start + page_size]
+        headers = {}
+        if start + page_size < len(items):
+            headers["X-Next-Cursor"] = encode_cursor(page[-1][key])
+        return FastJSONResponse(content=page, headers=headers)
+
+
+catalog = CatalogStore()
+background_tasks: set = set()
+
+
+async def refresh_catalog_periodically():
+    while True:
+        await asyncio.sleep(CATALOG_REFRESH_SECONDS)
+        try:
+            await catalog.load()
+        except Exception:
+            logger.exception("Catalog refresh failed")
+
+
+ACTIVITY_QUEUE_SIZE = int(os.environ.get('ACTIVITY_QUEUE_SIZE', '10000'))
+ACHIEVEMENT_BATCH_SIZE = int(os.environ.get('ACHIEVEMENT_BATCH_SIZE', '256'))
+ACHIEVEMENT_BATCH_WAIT_SECONDS = float(os.environ.get('ACHIEVEMENT_BATCH_WAIT_SECONDS', '0.05'))
+EARNED_CACHE_MAX_SIZE = 100_000
+
+
+class ActivityEvent(NamedTuple):
+    kind: str
+    user_id: str
+    occurred_at: datetime
+    data: Optional[Dict[str, Any]] = None
+
+
+class AchievementRule(NamedTuple):
+    achievement_id: str
+    kinds: tuple
+    condition: Callable[[ActivityEvent], bool]
+
+
+def event_value(event: ActivityEvent, key: str, default: Any = None) -> Any:
+    return (event.data or {}).get(key, default)
+
+
+def local_hour_between(event: ActivityEvent, start: int, end: int) -> bool:
+    # Without the client's UTC offset the local hour is unknown; the server's clock says nothing about it.
+    hour = event_value(event, "local_hour")
+    return hour is not None and start <= hour < end
+
+
+ACHIEVEMENT_RULES = [
+    AchievementRule("first_step", ("user_registered",), lambda event: True),
+    AchievementRule("roadmap_rookie", ("node_completed",), lambda event: True),
+    AchievementRule("roadmap_master", ("node_completed",), lambda event: event_value(event, "progress_percentage") == 100),
+    AchievementRule("week_warrior", ("node_completed",), lambda event: event_value(event, "streak", 0) >= 7),
+    AchievementRule("night_owl", ("node_completed",), lambda event: local_hour_between(event, 0, 4)),
+    AchievementRule("early_bird", ("node_completed",), lambda event: local_hour_between(event, 4, 6)),
+    AchievementRule("problem_solver", ("challenge_solved",), lambda event: True),
+]
+
+
+def local_hour_from_offset(occurred_at: datetime, utc_offset_minutes: Any) -> Optional[int]:
+    if not isinstance(utc_offset_minutes, int) or isinstance(utc_offset_minutes, bool):
+        return None
+    if not -14 * 60 <= utc_offset_minutes <= 14 * 60:
+        return None
+    return (occurred_at + timedelta(minutes=utc_offset_minutes)).hour
+
+
+async def grant_achievements(pairs: List[tuple]) -> List[tuple]:
+    pairs = [pair for pair in pairs if pair[1] in catalog.achievements]
+    if not pairs:
+        return []
+    
+    earned_at = datetime.now(timezone.utc).isoformat()
+    operations = [
+        UpdateOne(
+            {"user_id": user_id, "achievement_id": achievement_id},
+            {"$setOnInsert": {"user_achievement_id": f"ua_{uuid.uuid4().hex[:12]}", "earned_at": earned_at}},
+            upsert=True
+        )
+        for user_id, achievement_id in pairs
+    ]
+    try:
+        upserted_indexes = set((await db.user_achievements.bulk_write(operations, ordered=False)).upserted_ids)
+    except BulkWriteError as e:
+        if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+            raise
+        upserted_indexes = {upsert["index"] for upsert in e.details["upserted"]}
+    
+    granted = [pair for index, pair in enumerate(pairs) if index in upserted_indexes]
+    xp_by_user: Dict[str, int] = {}
+    for user_id, achievement_id in granted:
+        xp_by_user[user_id] = xp_by_user.get(user_id, 0) + catalog.achievements[achievement_id]["xp_reward"]
+    if not xp_by_user:
+        return granted
+    
+    await db.users.bulk_write([
+        UpdateOne({"user_id": user_id}, [
+            {"$set": {"xp": {"$add": [{"$ifNull": ["$xp", 0]}, amount]}}},
+            {"$set": {"level": LEVEL_FROM_XP}},
+        ])
+        for user_id, amount in xp_by_user.items()
+    ], ordered=False)
+    
+    async for user_doc in db.users.find({"user_id": {"$in": list(xp_by_user)}}, {"_id": 0, "password_hash": 0}):
+        session_cache.refresh_user(user_doc)
+        xp_ranking.update(user_doc["user_id"], user_doc.get("xp", 0))
+    return granted
+
+
+class AchievementEngine:
+    def __init__(self, rules: List[AchievementRule], queue_size: int):
+        self.rules = rules
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._earned: "OrderedDict[tuple, None]" = OrderedDict()
+
+    def emit(self, event: ActivityEvent):
+        if self._queue is None:
+            activity_events_dropped_total.inc(event.kind, "not_running")
+            logger.warning(f"Achievement engine not running, dropping {event.kind} event")
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            activity_events_dropped_total.inc(event.kind, "queue_full")
+            logger.warning(f"Activity queue full, dropping {event.kind} event")
+
+    def evaluate(self, events: List[ActivityEvent]) -> List[tuple]:
+        pairs = {}
+        for event in events:
+            for rule in self.rules:
+                pair = (event.user_id, rule.achievement_id)
+                if event.kind in rule.kinds and pair not in self._earned and rule.condition(event):
+                    pairs[pair] = None
+        return list(pairs)
+
+    def _remember(self, pairs: List[tuple]):
+        for pair in pairs:
+            self._earned[pair] = None
+            self._earned.move_to_end(pair)
+        while len(self._earned) > EARNED_CACHE_MAX_SIZE:
+            self._earned.popitem(last=False)
+
+    async def process(self, events: List[ActivityEvent]) -> List[tuple]:
+        pairs = self.evaluate(events)
+        if not pairs:
+            return []
+        granted = await grant_achievements(pairs)
+        self._remember(pairs)
+        return granted
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + ACHIEVEMENT_BATCH_WAIT_SECONDS
+            while len(batch) < ACHIEVEMENT_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self.process(batch)
+            except Exception:
+                logger.exception(f"Failed to process {len(batch)} activity events")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0):
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} unprocessed activity events on shutdown")
+            while not self._queue.empty():
+                activity_events_dropped_total.inc(self._queue.get_nowait().kind, "shutdown")
+        self._task.cancel()
+        self._task = None
+        self._queue = None
+
+
+achievement_engine = AchievementEngine(ACHIEVEMENT_RULES, ACTIVITY_QUEUE_SIZE)
+
+
+SESSION_DATA_URL = os.environ.get('SESSION_DATA_URL', 'https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data')
+SESSION_DATA_CONNECT_TIMEOUT = float(os.environ.get('SESSION_DATA_CONNECT_TIMEOUT', '3'))
+SESSION_DATA_READ_TIMEOUT = float(os.environ.get('SESSION_DATA_READ_TIMEOUT', '10'))
+SESSION_DATA_RETRIES = int(os.environ.get('SESSION_DATA_RETRIES', '2'))
+SESSION_DATA_BACKOFF_SECONDS = float(os.environ.get('SESSION_DATA_BACKOFF_SECONDS', '0.2'))
+SESSION_DATA_CACHE_SECONDS = float(os.environ.get('SESSION_DATA_CACHE_SECONDS', '30'))
+SESSION_DATA_CACHE_MAX_SIZE = 1000
+
+
+class SessionDataClient:
+    def __init__(self, url: str, retries: int, cache_ttl: float):
+        self.url = url
+        self.retries = retries
+        self.cache_ttl = cache_ttl
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def start(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        await self.close()
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(SESSION_DATA_READ_TIMEOUT, connect=SESSION_DATA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30),
+            transport=transport
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._cache.clear()
+
+    async def fetch(self, session_id: str) -> Dict[str, Any]:
+        cached = self._cache.get(session_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        if self._client is None:
+            await self.start()
+        
+        response = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(SESSION_DATA_BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            try:
+                response = await self._client.get(self.url, headers={"X-Session-ID": session_id})
+            except httpx.TransportError as e:
+                logger.warning(f"Session data request failed (attempt {attempt + 1}): {e!r}")
+                response = None
+                continue
+            if response.status_code < 500:
+                break
+        
+        if response is None or response.status_code >= 500:
+            raise HTTPException(status_code=502, detail="Session provider unavailable")
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Invalid session_id")
+        
+        data = response.json()
+        self._cache[session_id] = (time.monotonic() + self.cache_ttl, data)
+        while len(self._cache) > SESSION_DATA_CACHE_MAX_SIZE:
+            self._cache.popitem(last=False)
+        return data
+
+
+session_data_client = SessionDataClient(SESSION_DATA_URL, SESSION_DATA_RETRIES, SESSION_DATA_CACHE_SECONDS)
 
 
 @api_router.post("/auth/register")
@@ -161,7 +1648,7 @@ async def register(user_create: UserCreate):
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    password_hash = bcrypt.hashpw(user_create.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    password_hash = await password_hasher.hash(user_create.password)
     user_id = f"user_{uuid.uuid4().hex[:12]}"
     
     user_doc = {
@@ -174,20 +1661,18 @@ async def register(user_create: UserCreate):
         "level": 1,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.users.insert_one(user_doc)
-    
-    await award_achievement(user_id, "first_step")
+    try:
+        await db.users.insert_one(user_doc)
+    except DuplicateKeyError:
+        # A concurrent registration for the same email won the unique index.
+        raise HTTPException(status_code=400, detail="Email already registered")
+    xp_ranking.update(user_id, 0)
+    # Sign-up grants are guaranteed, so they bypass the best-effort activity queue.
+    await achievement_engine.process([ActivityEvent("user_registered", user_id, datetime.now(timezone.utc))])
     
-    session_token = f"session_{uuid.uuid4().hex}"
-    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-    await db.user_sessions.insert_one({
-        "user_id": user_id,
-        "session_token": session_token,
-        "expires_at": expires_at,
-        "created_at": datetime.now(timezone.utc)
-    })
+    session_token = await create_session(user_id)
     
-    response = JSONResponse(content={"message": "Registration successful", "user_id": user_id})
+    response = FastJSONResponse(content={"message": "Registration successful", "user_id": user_id})
     response.set_cookie(
         key="session_token",
         value=session_token,
@@ -195,7 +1680,7 @@ async def register(user_create: UserCreate):
         secure=True,
         samesite="none",
         path="/",
-        max_age=7*24*60*60
+        max_age=int(SESSION_TTL.total_seconds())
     )
     return response
 
@@ -206,19 +1691,12 @@ async def login(user_login: UserLogin):
     if not user_doc:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not bcrypt.checkpw(user_login.password.encode('utf-8'), user_doc["password_hash"].encode('utf-8')):
+    if not user_doc.get("password_hash") or not await password_hasher.verify(user_login.password, user_doc["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    session_token = f"session_{uuid.uuid4().hex}"
-    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-    await db.user_sessions.insert_one({
-        "user_id": user_doc["user_id"],
-        "session_token": session_token,
-        "expires_at": expires_at,
-        "created_at": datetime.now(timezone.utc)
-    })
+    session_token = await create_session(user_doc["user_id"])
     
-    response = JSONResponse(content={"message": "Login successful", "user_id": user_doc["user_id"]})
+    response = FastJSONResponse(content={"message": "Login successful", "user_id": user_doc["user_id"]})
     response.set_cookie(
         key="session_token",
         value=session_token,
@@ -226,7 +1704,7 @@ async def login(user_login: UserLogin):
         secure=True,
         samesite="none",
         path="/",
-        max_age=7*24*60*60
+        max_age=int(SESSION_TTL.total_seconds())
     )
     return response
 
@@ -238,18 +1716,29 @@ async def exchange_session(request: Request):
     if not session_id:
         raise HTTPException(status_code=400, detail="session_id required")
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-            headers={"X-Session-ID": session_id}
-        )
-        if response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid session_id")
-        
-        data = response.json()
+    data = await session_data_client.fetch(session_id)
     
     user_doc = await db.users.find_one({"email": data["email"]}, {"_id": 0})
     
+    if not user_doc:
+        user_id = f"user_{uuid.uuid4().hex[:12]}"
+        try:
+            await db.users.insert_one({
+                "user_id": user_id,
+                "email": data["email"],
+                "name": data.get("name", ""),
+                "picture": data.get("picture"),
+                "xp": 0,
+                "level": 1,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            })
+        except DuplicateKeyError:
+            # A concurrent exchange for the same email created the user first; sign into that account.
+            user_doc = await db.users.find_one({"email": data["email"]}, {"_id": 0})
+        else:
+            xp_ranking.update(user_id, 0)
+            await achievement_engine.process([ActivityEvent("user_registered", user_id, datetime.now(timezone.utc))])
+    
     if user_doc:
         user_id = user_doc["user_id"]
         await db.users.update_one(
@@ -259,32 +1748,13 @@ async def exchange_session(request: Request):
                 "picture": data.get("picture", user_doc.get("picture"))
             }}
         )
-    else:
-        user_id = f"user_{uuid.uuid4().hex[:12]}"
-        user_doc = {
-            "user_id": user_id,
-            "email": data["email"],
-            "name": data.get("name", ""),
-            "picture": data.get("picture"),
-            "xp": 0,
-            "level": 1,
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.users.insert_one(user_doc)
-        await award_achievement(user_id, "first_step")
     
-    session_token = data["session_token"]
-    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
-    await db.user_sessions.insert_one({
-        "user_id": user_id,
-        "session_token": session_token,
-        "expires_at": expires_at,
-        "created_at": datetime.now(timezone.utc)
-    })
+    session_token = await create_session(user_id, data["session_token"])
     
-    response_data = await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
+    user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0, "password_hash": 0})
+    session_cache.refresh_user(user_doc)
     
-    json_response = JSONResponse(content=response_data)
+    json_response = FastJSONResponse(content=user_payload(User(**user_doc)))
     json_response.set_cookie(
         key="session_token",
         value=session_token,
@@ -292,7 +1762,7 @@ async def exchange_session(request: Request):
         secure=True,
         samesite="none",
         path="/",
-        max_age=7*24*60*60
+        max_age=int(SESSION_TTL.total_seconds())
     )
     return json_response
 
@@ -300,39 +1770,72 @@ async def exchange_session(request: Request):
 @api_router.get("/auth/me")
 async def get_me(request: Request):
     user = await get_current_user(request)
-    return user
+    return FastJSONResponse(content=user_payload(user))
 
 
 @api_router.post("/auth/logout")
 async def logout(request: Request):
-    session_token = request.cookies.get("session_token")
+    session_token = get_session_token(request)
     if session_token:
-        await db.user_sessions.delete_one({"session_token": session_token})
+        session_cache.invalidate(session_token)
+        if session_token.startswith(SIGNED_TOKEN_PREFIX):
+            claims = decode_signed_token(session_token)
+            if claims:
+                await revoked_sessions.revoke(claims["sid"], claims["exp"])
+        else:
+            await db.user_sessions.delete_one({"session_token": session_token})
     
-    response = JSONResponse(content={"message": "Logged out successfully"})
+    response = FastJSONResponse(content={"message": "Logged out successfully"})
     response.delete_cookie(key="session_token", path="/")
     return response
 
 
 @api_router.get("/roadmaps")
-async def get_roadmaps():
-    roadmaps = await db.roadmaps.find({}, {"_id": 0}).to_list(100)
-    return roadmaps
+async def get_roadmaps(request: Request, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                       after: Optional[str] = None):
+    return catalog.listing(request, "roadmaps", limit, after)
 
 
 @api_router.get("/roadmaps/{roadmap_id}")
-async def get_roadmap(roadmap_id: str):
-    roadmap = await db.roadmaps.find_one({"roadmap_id": roadmap_id}, {"_id": 0})
-    if not roadmap:
+async def get_roadmap(roadmap_id: str, request: Request):
+    if roadmap_id not in catalog.roadmaps:
         raise HTTPException(status_code=404, detail="Roadmap not found")
-    return roadmap
+    return catalog.response(request, f"roadmap:{roadmap_id}")
+
+
+@api_router.get("/search")
+async def search_catalog(q: str = Query(..., min_length=1, max_length=200),
+                         limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT)):
+    return FastJSONResponse(content={"query": q, "results": search_index.search(q, limit)})
 
 
 @api_router.get("/progress")
-async def get_user_progress(request: Request):
+async def get_user_progress(request: Request, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                            after: Optional[str] = None):
     user = await get_current_user(request)
-    progress_list = await db.user_progress.find({"user_id": user.user_id}, {"_id": 0}).to_list(100)
-    return progress_list
+    return await paginated_find(
+        request, db.user_progress, {"user_id": user.user_id}, {"_id": 0},
+        "roadmap_id", limit, after, transform=catalog.progress_view
+    )
+
+
+@api_router.get("/progress/{roadmap_id}/next")
+async def get_next_nodes(roadmap_id: str, request: Request):
+    user = await get_current_user(request)
+    if roadmap_id not in catalog.node_indexes:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+    
+    progress_doc = await db.user_progress.find_one(
+        {"user_id": user.user_id, "roadmap_id": roadmap_id}, {"_id": 0, "completed_mask": 1, "completed_nodes": 1}
+    )
+    mask = catalog.completed_mask(roadmap_id, progress_doc)
+    nodes = catalog.roadmaps[roadmap_id]["nodes"]
+    return FastJSONResponse(content={
+        "roadmap_id": roadmap_id,
+        "completed_count": (mask & catalog.node_masks[roadmap_id]).bit_count(),
+        "total_nodes": len(nodes),
+        "next": [nodes[index] for index in catalog.next_available(roadmap_id, mask)]
+    })
 
 
 @api_router.post("/progress/{roadmap_id}/complete-node")
@@ -344,250 +1847,719 @@ async def complete_node(roadmap_id: str, request: Request):
     if not node_id:
         raise HTTPException(status_code=400, detail="node_id required")
     
-    progress = await db.user_progress.find_one({"user_id": user.user_id, "roadmap_id": roadmap_id}, {"_id": 0})
-    
-    if not progress:
-        progress_id = f"progress_{uuid.uuid4().hex[:12]}"
-        progress = {
-            "progress_id": progress_id,
-            "user_id": user.user_id,
-            "roadmap_id": roadmap_id,
-            "completed_nodes": [node_id],
-            "progress_percentage": 0.0,
-            "last_updated": datetime.now(timezone.utc).isoformat()
-        }
-        await db.user_progress.insert_one(progress)
-    else:
-        if node_id not in progress["completed_nodes"]:
-            completed_nodes = progress["completed_nodes"] + [node_id]
-            await db.user_progress.update_one(
-                {"user_id": user.user_id, "roadmap_id": roadmap_id},
-                {"$set": {
-                    "completed_nodes": completed_nodes,
-                    "last_updated": datetime.now(timezone.utc).isoformat()
-                }}
-            )
-            
-            await db.users.update_one({"user_id": user.user_id}, {"$inc": {"xp": 10}})
-    
-    roadmap = await db.roadmaps.find_one({"roadmap_id": roadmap_id}, {"_id": 0})
-    if roadmap:
-        progress_doc = await db.user_progress.find_one({"user_id": user.user_id, "roadmap_id": roadmap_id}, {"_id": 0})
-        total_nodes = len(roadmap["nodes"])
-        completed_count = len(progress_doc["completed_nodes"])
-        progress_percentage = (completed_count / total_nodes) * 100 if total_nodes > 0 else 0
-        
-        await db.user_progress.update_one(
-            {"user_id": user.user_id, "roadmap_id": roadmap_id},
-            {"$set": {"progress_percentage": progress_percentage}}
+    node_indexes = catalog.node_indexes.get(roadmap_id)
+    if node_indexes is None:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+    if node_id not in node_indexes:
+        raise HTTPException(status_code=404, detail="Node not found")
+    
+    node_bit = 1 << node_indexes[node_id]
+    progress_filter = {"user_id": user.user_id, "roadmap_id": roadmap_id}
+    progress_update = {
+        "$bit": {"completed_mask": {"or": Int64(node_bit)}},
+        "$set": {"last_updated": datetime.now(timezone.utc).isoformat()},
+        "$setOnInsert": {"progress_id": f"progress_{uuid.uuid4().hex[:12]}"}
+    }
+    try:
+        progress_before = await db.user_progress.find_one_and_update(
+            progress_filter, progress_update,
+            projection={"_id": 0, "completed_mask": 1},
+            upsert=True, return_document=ReturnDocument.BEFORE
         )
-        
-        if progress_percentage == 100:
-            await award_achievement(user.user_id, "roadmap_master")
+    except DuplicateKeyError:
+        progress_before = await db.user_progress.find_one_and_update(
+            progress_filter, progress_update,
+            projection={"_id": 0, "completed_mask": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+    
+    previous_mask = (progress_before or {}).get("completed_mask", 0)
+    if previous_mask & node_bit:
+        return FastJSONResponse(content={"message": "Node already completed", "xp_gained": 0})
+    
+    completed_at = datetime.now(timezone.utc)
+    user_doc = await grant_xp(user.user_id, XP_PER_NODE, activity_day=epoch_day(completed_at))
     
-    user_doc = await db.users.find_one({"user_id": user.user_id}, {"_id": 0})
-    new_level = calculate_level_from_xp(user_doc["xp"])
-    await db.users.update_one({"user_id": user.user_id}, {"$set": {"level": new_level}})
+    achievement_engine.emit(ActivityEvent("node_completed", user.user_id, completed_at, {
+        "roadmap_id": roadmap_id,
+        "node_id": node_id,
+        "progress_percentage":
+            (((previous_mask | node_bit) & catalog.node_masks[roadmap_id]).bit_count() / len(node_indexes)) * 100,
+        "streak": ((user_doc or {}).get("activity") or {}).get("streak", 0),
+        "local_hour": local_hour_from_offset(completed_at, body.get("utc_offset_minutes")),
+    }))
     
-    return {"message": "Node completed", "xp_gained": 10}
+    return FastJSONResponse(content={"message": "Node completed", "xp_gained": XP_PER_NODE})
+
+
+MAX_BATCH_COMPLETIONS = 1000
+
+
+class NodeCompletion(BaseModel):
+    roadmap_id: str
+    node_id: str
+
+
+class NodeCompletionBatch(BaseModel):
+    completions: List[NodeCompletion] = Field(..., min_length=1, max_length=MAX_BATCH_COMPLETIONS)
+    utc_offset_minutes: Optional[int] = None
+
+
+@api_router.post("/progress/complete-nodes")
+async def complete_nodes(batch: NodeCompletionBatch, request: Request):
+    user = await get_current_user(request)
+    
+    nodes_by_roadmap: Dict[str, List[int]] = {}
+    for completion in batch.completions:
+        node_indexes = catalog.node_indexes.get(completion.roadmap_id)
+        if node_indexes is None:
+            raise HTTPException(status_code=404, detail=f"Roadmap not found: {completion.roadmap_id}")
+        if completion.node_id not in node_indexes:
+            raise HTTPException(status_code=404, detail=f"Node not found: {completion.roadmap_id}/{completion.node_id}")
+        roadmap_nodes = nodes_by_roadmap.setdefault(completion.roadmap_id, [])
+        if node_indexes[completion.node_id] not in roadmap_nodes:
+            roadmap_nodes.append(node_indexes[completion.node_id])
+    
+    now = datetime.now(timezone.utc).isoformat()
+    operations = []
+    for roadmap_id, node_bits in nodes_by_roadmap.items():
+        progress_filter = {"user_id": user.user_id, "roadmap_id": roadmap_id}
+        operations.append(UpdateOne(
+            progress_filter,
+            {"$setOnInsert": {
+                "progress_id": f"progress_{uuid.uuid4().hex[:12]}",
+                "completed_mask": Int64(0),
+                "last_updated": now
+            }},
+            upsert=True
+        ))
+        for bit in node_bits:
+            operations.append(UpdateOne(
+                {**progress_filter, "completed_mask": {"$bitsAllClear": [bit]}},
+                {"$bit": {"completed_mask": {"or": Int64(1 << bit)}}, "$set": {"last_updated": now}}
+            ))
+    
+    try:
+        newly_completed = (await db.user_progress.bulk_write(operations, ordered=True)).modified_count
+    except BulkWriteError as e:
+        if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+            raise
+        retry = await db.user_progress.bulk_write(operations, ordered=True)
+        newly_completed = e.details["nModified"] + retry.modified_count
+    
+    progress_list = [
+        catalog.progress_view(progress_doc)
+        async for progress_doc in db.user_progress.find(
+            {"user_id": user.user_id, "roadmap_id": {"$in": list(nodes_by_roadmap)}}, {"_id": 0}
+        )
+    ]
+    
+    if newly_completed:
+        completed_at = datetime.now(timezone.utc)
+        user_doc = await grant_xp(user.user_id, newly_completed * XP_PER_NODE, activity_day=epoch_day(completed_at))
+        streak = ((user_doc or {}).get("activity") or {}).get("streak", 0)
+        for progress in progress_list:
+            achievement_engine.emit(ActivityEvent("node_completed", user.user_id, completed_at, {
+                "roadmap_id": progress["roadmap_id"],
+                "progress_percentage": progress["progress_percentage"],
+                "streak": streak,
+                "local_hour": local_hour_from_offset(completed_at, batch.utc_offset_minutes),
+            }))
+    
+    return FastJSONResponse(content={
+        "message": "Nodes completed",
+        "completed": newly_completed,
+        "xp_gained": newly_completed * XP_PER_NODE,
+        "progress": progress_list
+    })
 
 
 @api_router.get("/achievements")
-async def get_achievements():
-    achievements = await db.achievements.find({}, {"_id": 0}).to_list(100)
-    return achievements
+async def get_achievements(request: Request, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                           after: Optional[str] = None):
+    return catalog.listing(request, "achievements", limit, after)
+
+
+def join_achievement(user_achievement: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    achievement = catalog.achievements.get(user_achievement["achievement_id"])
+    if not achievement:
+        return None
+    return {**achievement, "earned_at": user_achievement["earned_at"]}
 
 
 @api_router.get("/user-achievements")
-async def get_user_achievements(request: Request):
+async def get_user_achievements(request: Request, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                                after: Optional[str] = None):
     user = await get_current_user(request)
-    user_achievements = await db.user_achievements.find({"user_id": user.user_id}, {"_id": 0}).to_list(100)
-    
-    achievement_details = []
-    for ua in user_achievements:
-        achievement = await db.achievements.find_one({"achievement_id": ua["achievement_id"]}, {"_id": 0})
-        if achievement:
-            achievement_details.append({
-                **achievement,
-                "earned_at": ua["earned_at"]
-            })
+    return await paginated_find(
+        request, db.user_achievements, {"user_id": user.user_id}, {"_id": 0, "achievement_id": 1, "earned_at": 1},
+        "achievement_id", limit, after, transform=join_achievement
+    )
+
+
+@api_router.get("/dashboard")
+async def get_dashboard(request: Request):
+    user = await get_current_user(request)
+    progress_list, user_achievements = await asyncio.gather(
+        db.user_progress.find({"user_id": user.user_id}, {"_id": 0}).sort("roadmap_id", ASCENDING).to_list(None),
+        db.user_achievements.find(
+            {"user_id": user.user_id}, {"_id": 0, "achievement_id": 1, "earned_at": 1}
+        ).sort("achievement_id", ASCENDING).to_list(None),
+    )
     
-    return achievement_details
+    progress = []
+    for progress_doc in progress_list:
+        roadmap = catalog.roadmaps.get(progress_doc["roadmap_id"])
+        progress.append({
+            **catalog.progress_view(progress_doc),
+            "roadmap_title": roadmap["title"] if roadmap else progress_doc["roadmap_id"],
+            "total_nodes": len(roadmap["nodes"]) if roadmap else 0
+        })
+    
+    achievements = [item for item in map(join_achievement, user_achievements) if item is not None]
+    
+    return FastJSONResponse(content={"user": user_payload(user), "progress": progress, "achievements": achievements})
+
+
+LEADERBOARD_PROJECTION = {"_id": 0, "user_id": 1, "name": 1, "picture": 1, "xp": 1, "level": 1}
+LEADERBOARD_ORDER = [("xp", DESCENDING), ("user_id", ASCENDING)]
+
+
+async def rank_for_xp(xp: Optional[int]) -> int:
+    if xp_ranking.ready:
+        return xp_ranking.rank(xp)
+    return await db.users.count_documents({"xp": {"$gt": xp or 0}}) + 1
+
+
+async def leaderboard_entries(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ranks a contiguous slice of users in LEADERBOARD_ORDER; ties share the rank of the first tied user."""
+    if not docs:
+        return []
+    if xp_ranking.ready:
+        return [{**doc, "xp": doc.get("xp", 0), "rank": xp_ranking.rank(doc.get("xp", 0))} for doc in docs]
+    
+    # Until the in-memory ranking is ready, two counts anchor the page instead of one count per row.
+    first_xp, first_user_id = docs[0].get("xp", 0), docs[0]["user_id"]
+    above, tied_before = await asyncio.gather(
+        db.users.count_documents({"xp": {"$gt": first_xp}}),
+        db.users.count_documents({"xp": first_xp, "user_id": {"$lt": first_user_id}}),
+    )
+    entries, rank, previous_xp = [], above + 1, first_xp
+    for position, doc in enumerate(docs, start=above + tied_before + 1):
+        xp = doc.get("xp", 0)
+        if xp != previous_xp:
+            rank, previous_xp = position, xp
+        entries.append({**doc, "xp": xp, "rank": rank})
+    return entries
+
+
+@api_router.get("/leaderboard")
+async def get_leaderboard(limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE), after: Optional[str] = None):
+    query = {}
+    if after:
+        try:
+            after_xp, after_user_id = json.loads(decode_cursor(after))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = {"$or": [
+            {"xp": {"$lt": after_xp}},
+            {"xp": after_xp, "user_id": {"$gt": after_user_id}}
+        ]}
+    
+    docs = await db.users.find(query, LEADERBOARD_PROJECTION).sort(LEADERBOARD_ORDER).limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(json.dumps([docs[-1].get("xp", 0), docs[-1]["user_id"]]))
+    return FastJSONResponse(content=await leaderboard_entries(docs), headers=headers)
+
+
+@api_router.get("/leaderboard/me")
+async def get_my_leaderboard_position(request: Request, radius: int = Query(5, ge=0, le=50)):
+    user = await get_current_user(request)
+    above_query = {"$or": [{"xp": {"$gt": user.xp}}, {"xp": user.xp, "user_id": {"$lt": user.user_id}}]}
+    below_query = {"$or": [{"xp": {"$lt": user.xp}}, {"xp": user.xp, "user_id": {"$gt": user.user_id}}]}
+    above, below = await asyncio.gather(
+        db.users.find(above_query, LEADERBOARD_PROJECTION)
+        .sort([("xp", ASCENDING), ("user_id", DESCENDING)]).limit(radius).to_list(radius),
+        db.users.find(below_query, LEADERBOARD_PROJECTION)
+        .sort(LEADERBOARD_ORDER).limit(radius).to_list(radius),
+    )
+    
+    return FastJSONResponse(content={
+        "rank": await rank_for_xp(user.xp),
+        "total": len(xp_ranking) if xp_ranking.ready else await db.users.estimated_document_count(),
+        "user": {k: v for k, v in user.model_dump().items() if k in LEADERBOARD_PROJECTION},
+        "above": await leaderboard_entries(list(reversed(above))),
+        "below": await leaderboard_entries(below),
+    })
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for name, value in (
+        ("bcrypt_pool_in_flight", password_hasher.pending),
+        ("bcrypt_pool_queue_depth", password_hasher.queue_depth),
+    ):
+        lines.extend([f"# TYPE {name} gauge", f"{name} {value}"])
+    for name, attribute in (("concurrency_limit", "limit"), ("concurrency_in_flight", "in_flight")):
+        lines.append(f"# TYPE {name} gauge")
+        for route_class, limiter in concurrency_limiters.items():
+            lines.append(f'{name}{{route_class="{route_class}"}} {getattr(limiter, attribute)}')
+    return Response(content="\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
 
 
 app.include_router(api_router)
 
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE, compresslevel=GZIP_LEVEL)
+app.add_middleware(LoadSheddingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
+app.add_middleware(MetricsMiddleware)
+
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in list(background_tasks):
+        task.cancel()
+    await achievement_engine.stop()
     client.close()
+    password_hasher.shutdown()
+    await session_data_client.close()
 
 
-@app.on_event("startup")
-async def initialize_data():
-    achievements_count = await db.achievements.count_documents({})
-    if achievements_count == 0:
-        achievements = [
-            {
-                "achievement_id": "first_step",
-                "name": "First Step",
-                "description": "Welcome to Pixel Coders!",
-                "icon": "🎮",
-                "xp_reward": 10
-            },
-            {
-                "achievement_id": "week_warrior",
-                "name": "Week Warrior",
-                "description": "7-day learning streak",
-                "icon": "🔥",
-                "xp_reward": 50
-            },
-            {
-                "achievement_id": "roadmap_rookie",
-                "name": "Roadmap Rookie",
-                "description": "Started your first roadmap",
-                "icon": "🗺️",
-                "xp_reward": 20
-            },
-            {
-                "achievement_id": "roadmap_master",
-                "name": "Roadmap Master",
-                "description": "Completed an entire roadmap",
-                "icon": "🏆",
-                "xp_reward": 100
-            },
-            {
-                "achievement_id": "problem_solver",
-                "name": "Problem Solver",
-                "description": "Solved your first challenge",
-                "icon": "💡",
-                "xp_reward": 15
-            },
-            {
-                "achievement_id": "community_member",
-                "name": "Community Member",
-                "description": "Made your first forum post",
-                "icon": "👥",
-                "xp_reward": 25
-            },
-            {
-                "achievement_id": "night_owl",
-                "name": "Night Owl",
-                "description": "Studied after midnight",
-                "icon": "🦉",
-                "xp_reward": 30
-            },
-            {
-                "achievement_id": "early_bird",
-                "name": "Early Bird",
-                "description": "Studied before 6 AM",
-                "icon": "🌅",
-                "xp_reward": 30
-            }
+DEFAULT_ACHIEVEMENTS = [
+    {
+        "achievement_id": "first_step",
+        "name": "First Step",
+        "description": "Welcome to Pixel Coders!",
+        "icon": "🎮",
+        "xp_reward": 10
+    },
+    {
+        "achievement_id": "week_warrior",
+        "name": "Week Warrior",
+        "description": "7-day learning streak",
+        "icon": "🔥",
+        "xp_reward": 50
+    },
+    {
+        "achievement_id": "roadmap_rookie",
+        "name": "Roadmap Rookie",
+        "description": "Started your first roadmap",
+        "icon": "🗺️",
+        "xp_reward": 20
+    },
+    {
+        "achievement_id": "roadmap_master",
+        "name": "Roadmap Master",
+        "description": "Completed an entire roadmap",
+        "icon": "🏆",
+        "xp_reward": 100
+    },
+    {
+        "achievement_id": "problem_solver",
+        "name": "Problem Solver",
+        "description": "Solved your first challenge",
+        "icon": "💡",
+        "xp_reward": 15
+    },
+    {
+        "achievement_id": "community_member",
+        "name": "Community Member",
+        "description": "Made your first forum post",
+        "icon": "👥",
+        "xp_reward": 25
+    },
+    {
+        "achievement_id": "night_owl",
+        "name": "Night Owl",
+        "description": "Studied after midnight",
+        "icon": "🦉",
+        "xp_reward": 30
+    },
+    {
+        "achievement_id": "early_bird",
+        "name": "Early Bird",
+        "description": "Studied before 6 AM",
+        "icon": "🌅",
+        "xp_reward": 30
+    }
+]
+
+
+DEFAULT_ROADMAPS = [
+    {
+        "roadmap_id": "frontend_dev",
+        "title": "Frontend Developer",
+        "description": "Master modern frontend development with React, HTML, CSS, and JavaScript",
+        "difficulty": "Beginner to Advanced",
+        "estimated_time": "4-6 months",
+        "nodes": [
+            {"id": "html_basics", "label": "HTML Basics", "description": "Learn HTML structure, tags, and semantic elements", "resources": [{"type": "article", "url": "https://developer.mozilla.org/en-US/docs/Web/HTML", "title": "MDN HTML Guide"}], "prerequisites": []},
+            {"id": "css_fundamentals", "label": "CSS Fundamentals", "description": "Styling, layouts, and responsive design", "resources": [{"type": "article", "url": "https://developer.mozilla.org/en-US/docs/Web/CSS", "title": "MDN CSS Guide"}], "prerequisites": ["html_basics"]},
+            {"id": "javascript_basics", "label": "JavaScript Basics", "description": "Variables, functions, and DOM manipulation", "resources": [{"type": "article", "url": "https://javascript.info/", "title": "JavaScript.info"}], "prerequisites": ["html_basics"]},
+            {"id": "react_fundamentals", "label": "React Fundamentals", "description": "Components, props, state, and hooks", "resources": [{"type": "article", "url": "https://react.dev/learn", "title": "React Official Docs"}], "prerequisites": ["css_fundamentals", "javascript_basics"]},
+            {"id": "state_management", "label": "State Management", "description": "Redux, Context API, Zustand", "resources": [], "prerequisites": ["react_fundamentals"]},
+            {"id": "api_integration", "label": "API Integration", "description": "Fetch, Axios, REST APIs", "resources": [], "prerequisites": ["javascript_basics"]},
+            {"id": "build_tools", "label": "Build Tools", "description": "Webpack, Vite, npm", "resources": [], "prerequisites": ["javascript_basics"]},
+            {"id": "testing", "label": "Testing", "description": "Jest, React Testing Library", "resources": [], "prerequisites": ["react_fundamentals"]}
         ]
-        await db.achievements.insert_many(achievements)
-        logger.info("Initialized achievements")
-    
-    roadmaps_count = await db.roadmaps.count_documents({})
-    if roadmaps_count == 0:
-        roadmaps = [
-            {
-                "roadmap_id": "frontend_dev",
-                "title": "Frontend Developer",
-                "description": "Master modern frontend development with React, HTML, CSS, and JavaScript",
-                "difficulty": "Beginner to Advanced",
-                "estimated_time": "4-6 months",
-                "nodes": [
-                    {"id": "html_basics", "label": "HTML Basics", "description": "Learn HTML structure, tags, and semantic elements", "resources": [{"type": "article", "url": "https://developer.mozilla.org/en-US/docs/Web/HTML", "title": "MDN HTML Guide"}]},
-                    {"id": "css_fundamentals", "label": "CSS Fundamentals", "description": "Styling, layouts, and responsive design", "resources": [{"type": "article", "url": "https://developer.mozilla.org/en-US/docs/Web/CSS", "title": "MDN CSS Guide"}]},
-                    {"id": "javascript_basics", "label": "JavaScript Basics", "description": "Variables, functions, and DOM manipulation", "resources": [{"type": "article", "url": "https://javascript.info/", "title": "JavaScript.info"}]},
-                    {"id": "react_fundamentals", "label": "React Fundamentals", "description": "Components, props, state, and hooks", "resources": [{"type": "article", "url": "https://react.dev/learn", "title": "React Official Docs"}]},
-                    {"id": "state_management", "label": "State Management", "description": "Redux, Context API, Zustand", "resources": []},
-                    {"id": "api_integration", "label": "API Integration", "description": "Fetch, Axios, REST APIs", "resources": []},
-                    {"id": "build_tools", "label": "Build Tools", "description": "Webpack, Vite, npm", "resources": []},
-                    {"id": "testing", "label": "Testing", "description": "Jest, React Testing Library", "resources": []}
-                ],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "roadmap_id": "backend_dev",
-                "title": "Backend Developer",
-                "description": "Build scalable server-side applications with Node.js, databases, and APIs",
-                "difficulty": "Intermediate",
-                "estimated_time": "5-7 months",
-                "nodes": [
-                    {"id": "nodejs_basics", "label": "Node.js Basics", "description": "Event loop, modules, npm", "resources": []},
-                    {"id": "express_framework", "label": "Express Framework", "description": "Routing, middleware, REST APIs", "resources": []},
-                    {"id": "databases", "label": "Databases", "description": "SQL (PostgreSQL) and NoSQL (MongoDB)", "resources": []},
-                    {"id": "authentication", "label": "Authentication", "description": "JWT, OAuth, sessions", "resources": []},
-                    {"id": "api_design", "label": "API Design", "description": "RESTful principles, GraphQL", "resources": []},
-                    {"id": "security", "label": "Security", "description": "HTTPS, CORS, input validation", "resources": []},
-                    {"id": "deployment", "label": "Deployment", "description": "Docker, AWS, Heroku", "resources": []},
-                    {"id": "testing_backend", "label": "Testing", "description": "Unit tests, integration tests", "resources": []}
-                ],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "roadmap_id": "fullstack_dev",
-                "title": "Full Stack Developer",
-                "description": "Combine frontend and backend skills to build complete web applications",
-                "difficulty": "Advanced",
-                "estimated_time": "8-12 months",
-                "nodes": [
-                    {"id": "frontend_skills", "label": "Frontend Skills", "description": "React, Vue, or Angular", "resources": []},
-                    {"id": "backend_skills", "label": "Backend Skills", "description": "Node.js, Python, or Java", "resources": []},
-                    {"id": "database_design", "label": "Database Design", "description": "Schema design, relationships", "resources": []},
-                    {"id": "api_architecture", "label": "API Architecture", "description": "REST, GraphQL, WebSockets", "resources": []},
-                    {"id": "devops_basics", "label": "DevOps Basics", "description": "CI/CD, Docker, Kubernetes", "resources": []},
-                    {"id": "cloud_platforms", "label": "Cloud Platforms", "description": "AWS, Azure, GCP", "resources": []},
-                    {"id": "monitoring", "label": "Monitoring", "description": "Logging, error tracking, analytics", "resources": []},
-                    {"id": "scalability", "label": "Scalability", "description": "Load balancing, caching, microservices", "resources": []}
-                ],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "roadmap_id": "python_dev",
-                "title": "Python Developer",
-                "description": "Master Python for web development, automation, and data science",
-                "difficulty": "Beginner to Intermediate",
-                "estimated_time": "4-6 months",
-                "nodes": [
-                    {"id": "python_basics", "label": "Python Basics", "description": "Syntax, data types, functions", "resources": []},
-                    {"id": "oop_python", "label": "OOP in Python", "description": "Classes, inheritance, polymorphism", "resources": []},
-                    {"id": "python_web", "label": "Web Frameworks", "description": "Django, Flask, FastAPI", "resources": []},
-                    {"id": "database_python", "label": "Database with Python", "description": "SQLAlchemy, PyMongo", "resources": []},
-                    {"id": "python_testing", "label": "Testing", "description": "pytest, unittest", "resources": []},
-                    {"id": "python_async", "label": "Async Programming", "description": "asyncio, concurrent execution", "resources": []},
-                    {"id": "python_packages", "label": "Package Management", "description": "pip, virtual environments", "resources": []},
-                    {"id": "python_deployment", "label": "Deployment", "description": "Gunicorn, Docker", "resources": []}
-                ],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "roadmap_id": "data_science",
-                "title": "Data Science",
-                "description": "Analyze data, build models, and extract insights with Python and ML",
-                "difficulty": "Intermediate to Advanced",
-                "estimated_time": "6-10 months",
-                "nodes": [
-                    {"id": "statistics", "label": "Statistics", "description": "Probability, distributions, hypothesis testing", "resources": []},
-                    {"id": "python_data", "label": "Python for Data", "description": "NumPy, Pandas, Matplotlib", "resources": []},
-                    {"id": "data_cleaning", "label": "Data Cleaning", "description": "Handling missing data, outliers", "resources": []},
-                    {"id": "machine_learning", "label": "Machine Learning", "description": "Supervised, unsupervised learning", "resources": []},
-                    {"id": "deep_learning", "label": "Deep Learning", "description": "Neural networks, TensorFlow, PyTorch", "resources": []},
-                    {"id": "data_viz", "label": "Data Visualization", "description": "Seaborn, Plotly, dashboards", "resources": []},
-                    {"id": "sql_data", "label": "SQL for Data", "description": "Queries, joins, aggregations", "resources": []},
-                    {"id": "big_data", "label": "Big Data", "description": "Spark, Hadoop", "resources": []}
-                ],
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
+    },
+    {
+        "roadmap_id": "backend_dev",
+        "title": "Backend Developer",
+        "description": "Build scalable server-side applications with Node.js, databases, and APIs",
+        "difficulty": "Intermediate",
+        "estimated_time": "5-7 months",
+        "nodes": [
+            {"id": "nodejs_basics", "label": "Node.js Basics", "description": "Event loop, modules, npm", "resources": [], "prerequisites": []},
+            {"id": "express_framework", "label": "Express Framework", "description": "Routing, middleware, REST APIs", "resources": [], "prerequisites": ["nodejs_basics"]},
+            {"id": "databases", "label": "Databases", "description": "SQL (PostgreSQL) and NoSQL (MongoDB)", "resources": [], "prerequisites": ["nodejs_basics"]},
+            {"id": "authentication", "label": "Authentication", "description": "JWT, OAuth, sessions", "resources": [], "prerequisites": ["express_framework", "databases"]},
+            {"id": "api_design", "label": "API Design", "description": "RESTful principles, GraphQL", "resources": [], "prerequisites": ["express_framework"]},
+            {"id": "security", "label": "Security", "description": "HTTPS, CORS, input validation", "resources": [], "prerequisites": ["authentication"]},
+            {"id": "deployment", "label": "Deployment", "description": "Docker, AWS, Heroku", "resources": [], "prerequisites": ["api_design"]},
+            {"id": "testing_backend", "label": "Testing", "description": "Unit tests, integration tests", "resources": [], "prerequisites": ["express_framework"]}
+        ]
+    },
+    {
+        "roadmap_id": "fullstack_dev",
+        "title": "Full Stack Developer",
+        "description": "Combine frontend and backend skills to build complete web applications",
+        "difficulty": "Advanced",
+        "estimated_time": "8-12 months",
+        "nodes": [
+            {"id": "frontend_skills", "label": "Frontend Skills", "description": "React, Vue, or Angular", "resources": [], "prerequisites": []},
+            {"id": "backend_skills", "label": "Backend Skills", "description": "Node.js, Python, or Java", "resources": [], "prerequisites": []},
+            {"id": "database_design", "label": "Database Design", "description": "Schema design, relationships", "resources": [], "prerequisites": ["backend_skills"]},
+            {"id": "api_architecture", "label": "API Architecture", "description": "REST, GraphQL, WebSockets", "resources": [], "prerequisites": ["frontend_skills", "backend_skills"]},
+            {"id": "devops_basics", "label": "DevOps Basics", "description": "CI/CD, Docker, Kubernetes", "resources": [], "prerequisites": ["backend_skills"]},
+            {"id": "cloud_platforms", "label": "Cloud Platforms", "description": "AWS, Azure, GCP", "resources": [], "prerequisites": ["devops_basics"]},
+            {"id": "monitoring", "label": "Monitoring", "description": "Logging, error tracking, analytics", "resources": [], "prerequisites": ["cloud_platforms"]},
+            {"id": "scalability", "label": "Scalability", "description": "Load balancing, caching, microservices", "resources": [], "prerequisites": ["api_architecture", "database_design", "cloud_platforms"]}
+        ]
+    },
+    {
+        "roadmap_id": "python_dev",
+        "title": "Python Developer",
+        "description": "Master Python for web development, automation, and data science",
+        "difficulty": "Beginner to Intermediate",
+        "estimated_time": "4-6 months",
+        "nodes": [
+            {"id": "python_basics", "label": "Python Basics", "description": "Syntax, data types, functions", "resources": [], "prerequisites": []},
+            {"id": "oop_python", "label": "OOP in Python", "description": "Classes, inheritance, polymorphism", "resources": [], "prerequisites": ["python_basics"]},
+            {"id": "python_web", "label": "Web Frameworks", "description": "Django, Flask, FastAPI", "resources": [], "prerequisites": ["oop_python"]},
+            {"id": "database_python", "label": "Database with Python", "description": "SQLAlchemy, PyMongo", "resources": [], "prerequisites": ["python_basics"]},
+            {"id": "python_testing", "label": "Testing", "description": "pytest, unittest", "resources": [], "prerequisites": ["python_basics"]},
+            {"id": "python_async", "label": "Async Programming", "description": "asyncio, concurrent execution", "resources": [], "prerequisites": ["oop_python"]},
+            {"id": "python_packages", "label": "Package Management", "description": "pip, virtual environments", "resources": [], "prerequisites": ["python_basics"]},
+            {"id": "python_deployment", "label": "Deployment", "description": "Gunicorn, Docker", "resources": [], "prerequisites": ["python_web", "python_packages"]}
+        ]
+    },
+    {
+        "roadmap_id": "data_science",
+        "title": "Data Science",
+        "description": "Analyze data, build models, and extract insights with Python and ML",
+        "difficulty": "Intermediate to Advanced",
+        "estimated_time": "6-10 months",
+        "nodes": [
+            {"id": "statistics", "label": "Statistics", "description": "Probability, distributions, hypothesis testing", "resources": [], "prerequisites": []},
+            {"id": "python_data", "label": "Python for Data", "description": "NumPy, Pandas, Matplotlib", "resources": [], "prerequisites": []},
+            {"id": "data_cleaning", "label": "Data Cleaning", "description": "Handling missing data, outliers", "resources": [], "prerequisites": ["python_data"]},
+            {"id": "machine_learning", "label": "Machine Learning", "description": "Supervised, unsupervised learning", "resources": [], "prerequisites": ["statistics", "data_cleaning"]},
+            {"id": "deep_learning", "label": "Deep Learning", "description": "Neural networks, TensorFlow, PyTorch", "resources": [], "prerequisites": ["machine_learning"]},
+            {"id": "data_viz", "label": "Data Visualization", "description": "Seaborn, Plotly, dashboards", "resources": [], "prerequisites": ["python_data"]},
+            {"id": "sql_data", "label": "SQL for Data", "description": "Queries, joins, aggregations", "resources": [], "prerequisites": []},
+            {"id": "big_data", "label": "Big Data", "description": "Spark, Hadoop", "resources": [], "prerequisites": ["sql_data", "python_data"]}
+        ]
+    }
+]
+
+
+INDEX_MANIFEST = {
+    "users": [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("xp", DESCENDING), ("user_id", ASCENDING)]),
+    ],
+    "user_sessions": [
+        IndexModel([("session_token", ASCENDING)], unique=True),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "revoked_sessions": [
+        IndexModel([("sid", ASCENDING)], unique=True),
+        IndexModel([("revoked_at", ASCENDING)]),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "user_progress": [
+        IndexModel([("user_id", ASCENDING), ("roadmap_id", ASCENDING)], unique=True),
+    ],
+    "user_achievements": [
+        IndexModel([("user_id", ASCENDING), ("achievement_id", ASCENDING)], unique=True),
+    ],
+    "roadmaps": [
+        IndexModel([("roadmap_id", ASCENDING)], unique=True),
+    ],
+    "achievements": [
+        IndexModel([("achievement_id", ASCENDING)], unique=True),
+    ],
+}
+
+QUERY_SHAPES = [
+    ("users", {"user_id": "user_x"}, None),
+    ("users", {"email": "x@example.com"}, None),
+    ("users", {}, LEADERBOARD_ORDER),
+    ("users", {"xp": 100, "user_id": {"$lt": "user_x"}}, None),
+    ("users", {"xp": {"$gt": 100}}, None),
+    ("users", {"user_id": {"$in": ["user_x", "user_y"]}}, None),
+    ("users", {"$or": [{"xp": {"$lt": 100}}, {"xp": 100, "user_id": {"$gt": "user_x"}}]}, LEADERBOARD_ORDER),
+    ("users", {"$or": [{"xp": {"$gt": 100}}, {"xp": 100, "user_id": {"$lt": "user_x"}}]},
+     [("xp", ASCENDING), ("user_id", DESCENDING)]),
+    ("user_sessions", {"session_token": "session_x"}, None),
+    ("revoked_sessions", {"sid": "sid_x"}, None),
+    ("revoked_sessions", {"expires_at": {"$gt": datetime(2000, 1, 1, tzinfo=timezone.utc)},
+                          "revoked_at": {"$gte": datetime(2000, 1, 1, tzinfo=timezone.utc)}}, None),
+    ("user_progress", {"user_id": "user_x"}, [("roadmap_id", ASCENDING)]),
+    ("user_progress", {"user_id": "user_x", "roadmap_id": {"$gt": "roadmap_x"}}, [("roadmap_id", ASCENDING)]),
+    ("user_progress", {"user_id": "user_x", "roadmap_id": "roadmap_x"}, None),
+    ("user_progress", {"user_id": "user_x", "roadmap_id": {"$in": ["roadmap_x", "roadmap_y"]}}, None),
+    ("user_achievements", {"user_id": "user_x"}, [("achievement_id", ASCENDING)]),
+    ("user_achievements", {"user_id": "user_x", "achievement_id": {"$gt": "achievement_x"}}, [("achievement_id", ASCENDING)]),
+    ("user_achievements", {"user_id": "user_x", "achievement_id": "achievement_x"}, None),
+    ("roadmaps", {"roadmap_id": "roadmap_x"}, None),
+]
+
+
+async def ensure_indexes() -> List[str]:
+    failures = []
+    for collection_name, indexes in INDEX_MANIFEST.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            failures.append(f"{collection_name}: could not apply indexes: {e}")
+    return failures
+
+
+def find_plan_stages(plan: Any) -> List[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(find_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(find_plan_stages(item))
+    return stages
+
+
+async def check_query_plans() -> List[str]:
+    failures = []
+    for collection_name, query, sort in QUERY_SHAPES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.explain()
+        stages = find_plan_stages(explanation["queryPlanner"]["winningPlan"])
+        if "COLLSCAN" in stages:
+            failures.append(f"{collection_name} {query} sort={sort}: COLLSCAN")
+        else:
+            logger.info(f"{collection_name} {query} sort={sort}: {' <- '.join(stages)}")
+    return failures
+
+
+async def migrate_progress_masks():
+    operations = []
+    unmapped = 0
+    async for progress_doc in db.user_progress.find(
+        {"completed_mask": {"$exists": False}}, {"_id": 1, "roadmap_id": 1, "completed_nodes": 1}
+    ):
+        roadmap_id, completed_nodes = progress_doc["roadmap_id"], progress_doc.get("completed_nodes", [])
+        update = {"$set": {"completed_mask": Int64(catalog.mask_from_node_ids(roadmap_id, completed_nodes))}}
+        if set(completed_nodes) <= catalog.node_bits.get(roadmap_id, {}).keys():
+            update["$unset"] = {"completed_nodes": "", "progress_percentage": ""}
+        else:
+            # Keep the original list for ids the catalog has no bit for, so nothing is lost.
+            unmapped += 1
+        operations.append(UpdateOne({"_id": progress_doc["_id"], "completed_mask": {"$exists": False}}, update))
+    if operations:
+        await db.user_progress.bulk_write(operations, ordered=False)
+        logger.info(f"Migrated {len(operations)} progress documents to completion bitmasks")
+    if unmapped:
+        logger.warning(f"{unmapped} progress documents reference unknown nodes; kept their completed_nodes")
+
+
+SEED_LOCK_SECONDS = float(os.environ.get('SEED_LOCK_SECONDS', '60'))
+SEED_LOCK_POLL_SECONDS = float(os.environ.get('SEED_LOCK_POLL_SECONDS', '0.5'))
+
+
+# Bump when seeding logic changes in a way the seed content does not capture (2: node_bits).
+SEED_SCHEMA = 2
+
+
+def compute_seed_version() -> str:
+    manifest = {
+        "schema": SEED_SCHEMA,
+        "achievements": DEFAULT_ACHIEVEMENTS,
+        "roadmaps": DEFAULT_ROADMAPS,
+        "indexes": {
+            collection_name: [
+                [list(index.document["key"].items()), {k: v for k, v in index.document.items() if k != "key"}]
+                for index in indexes
+            ]
+            for collection_name, indexes in INDEX_MANIFEST.items()
+        },
+    }
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+SEED_VERSION = compute_seed_version()
+
+
+async def seed_version_applied() -> bool:
+    marker = await db.meta.find_one({"_id": "seed"}, {"version": 1})
+    return marker is not None and marker.get("version") == SEED_VERSION
+
+
+async def acquire_seed_lock(owner: str) -> bool:
+    now = datetime.now(timezone.utc)
+    try:
+        await db.meta.update_one(
+            {"_id": "seed_lock", "expires_at": {"$lt": now}},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=SEED_LOCK_SECONDS)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def hold_seed_lock(owner: str):
+    # Seeding a large user_progress collection can outlast SEED_LOCK_SECONDS; keep extending the lease
+    # so another worker does not take it over mid-seed.
+    while True:
+        await asyncio.sleep(SEED_LOCK_SECONDS / 3)
+        result = await db.meta.update_one(
+            {"_id": "seed_lock", "owner": owner},
+            {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=SEED_LOCK_SECONDS)}}
+        )
+        if result.matched_count == 0:
+            logger.error("Lost the seed lock while seeding")
+            return
+
+
+async def apply_seed() -> bool:
+    """Bring the catalog, indexes and progress masks up to SEED_VERSION.
+
+    Returns True if this worker applied the seed (and loaded the catalog), False if it was already applied.
+    """
+    if await seed_version_applied():
+        return False
+    
+    owner = uuid.uuid4().hex
+    while not await acquire_seed_lock(owner):
+        await asyncio.sleep(SEED_LOCK_POLL_SECONDS)
+        if await seed_version_applied():
+            return False
+    
+    renewal = asyncio.create_task(hold_seed_lock(owner))
+    try:
+        if await seed_version_applied():
+            return False
+        
+        index_failures = await ensure_indexes()
+        for failure in index_failures:
+            logger.error(failure)
+        created_at = datetime.now(timezone.utc).isoformat()
+        await db.achievements.bulk_write([
+            UpdateOne({"achievement_id": achievement["achievement_id"]}, {"$set": achievement}, upsert=True)
+            for achievement in DEFAULT_ACHIEVEMENTS
+        ], ordered=False)
+        existing = {
+            roadmap_doc["roadmap_id"]: roadmap_doc
+            async for roadmap_doc in db.roadmaps.find({}, {"_id": 0, "roadmap_id": 1, "node_bits": 1, "nodes.id": 1})
+        }
+        operations = [
+            UpdateOne(
+                {"roadmap_id": roadmap["roadmap_id"]},
+                {"$set": {**roadmap, "node_bits": assign_node_bits(
+                    roadmap["roadmap_id"], stored_node_bits(existing.get(roadmap["roadmap_id"])),
+                    [node["id"] for node in roadmap["nodes"]]
+                )}, "$setOnInsert": {"created_at": created_at}},
+                upsert=True
+            )
+            for roadmap in DEFAULT_ROADMAPS
         ]
-        await db.roadmaps.insert_many(roadmaps)
-        logger.info("Initialized roadmaps")
+        seeded_ids = {roadmap["roadmap_id"] for roadmap in DEFAULT_ROADMAPS}
+        operations.extend(
+            UpdateOne(
+                {"roadmap_id": roadmap_id, "node_bits": {"$exists": False}},
+                {"$set": {"node_bits": stored_node_bits(roadmap_doc)}}
+            )
+            for roadmap_id, roadmap_doc in existing.items()
+            if roadmap_id not in seeded_ids and "node_bits" not in roadmap_doc
+        )
+        await db.roadmaps.bulk_write(operations, ordered=False)
+        await catalog.load()
+        await migrate_progress_masks()
+        if index_failures:
+            # Leave the marker unwritten so the next start retries the indexes.
+            logger.error(f"Seed version {SEED_VERSION} applied without all indexes; not marking it applied")
+        elif await db.meta.find_one({"_id": "seed_lock", "owner": owner}, {"_id": 1}) is None:
+            logger.error(f"Seed lock expired before seed version {SEED_VERSION} finished; not marking it applied")
+        else:
+            await db.meta.update_one(
+                {"_id": "seed"},
+                {"$set": {"version": SEED_VERSION, "applied_at": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+            logger.info(f"Applied seed version {SEED_VERSION}")
+        return True
+    finally:
+        renewal.cancel()
+        await db.meta.delete_one({"_id": "seed_lock", "owner": owner})
+
+
+@app.on_event("startup")
+async def initialize_data():
+    if not await apply_seed():
+        await catalog.load()
+    await session_data_client.start()
+    
+    achievement_engine.start()
+    
+    periodic_jobs = [refresh_catalog_periodically, rebuild_xp_ranking_periodically]
+    if SESSION_SIGNING_KEY:
+        periodic_jobs.append(refresh_revoked_sessions_periodically)
+    for periodic_job in periodic_jobs:
+        task = asyncio.create_task(periodic_job())
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+
+async def run_index_check() -> int:
+    failures = await ensure_indexes()
+    failures.extend(await check_query_plans())
+    for failure in failures:
+        logger.error(failure)
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pixel Coders backend maintenance tasks")
+    parser.add_argument("--check-indexes", action="store_true", help="apply the index manifest and fail if any query shape is a COLLSCAN")
+    args = parser.parse_args()
+    if args.check_indexes:
+        sys.exit(asyncio.run(run_index_check()))
+    parser.print_help()
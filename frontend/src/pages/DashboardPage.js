@@ -15,15 +15,11 @@ export default function DashboardPage() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [userRes, progressRes, achievementsRes] = await Promise.all([
-          axios.get(`${API}/auth/me`, { withCredentials: true }),
-          axios.get(`${API}/progress`, { withCredentials: true }),
-          axios.get(`${API}/user-achievements`, { withCredentials: true })
-        ]);
+        const response = await axios.get(`${API}/dashboard`, { withCredentials: true });
 
-        setUser(userRes.data);
-        setProgress(progressRes.data);
-        setAchievements(achievementsRes.data);
+        setUser(response.data.user);
+        setProgress(response.data.progress);
+        setAchievements(response.data.achievements);
       } catch (error) {
         console.error('Error fetching dashboard data:', error);
       } finally {
@@ -106,7 +102,7 @@ export default function DashboardPage() {
                 {progress.map((p) => (
                   <div key={p.progress_id} className="bg-black border-2 border-white p-4" data-testid="progress-item">
                     <div className="flex justify-between items-start mb-2">
-                      <div className="text-white font-['VT323'] text-lg">{p.roadmap_id}</div>
+                      <div className="text-white font-['VT323'] text-lg">{p.roadmap_title}</div>
                       <div className="text-[#00ff00] font-['Press_Start_2P'] text-xs">
                         {p.progress_percentage.toFixed(0)}%
                       </div>
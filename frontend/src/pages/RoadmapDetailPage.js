@@ -110,12 +110,12 @@ export default function RoadmapDetailPage() {
     if (!selectedNode) return;
 
     try {
-      await axios.post(
+      const response = await axios.post(
         `${API}/progress/${roadmapId}/complete-node`,
-        { node_id: selectedNode.id },
+        { node_id: selectedNode.id, utc_offset_minutes: -new Date().getTimezoneOffset() },
         { withCredentials: true }
       );
-      toast.success(`Completed: ${selectedNode.label}! +10 XP`);
+      toast.success(`Completed: ${selectedNode.label}! +${response.data.xp_gained} XP`);
       fetchData();
       setSelectedNode(null);
     } catch (error) {
@@ -0,0 +1,343 @@
+"""Endpoint benchmarks: drives the FastAPI app in-process against a local mongod.
+
+    python -m tests.benchmarks.endpoints --requests 2000 --concurrency 32
+    python -m tests.benchmarks.endpoints --save-baseline
+    python -m tests.benchmarks.endpoints --compare
+
+The target is BENCH_MONGO_URL / BENCH_DB_NAME (default mongodb://localhost:27017, pixel_coders_bench).
+The database is dropped and reseeded on every run, so the name must contain "bench".
+--save-baseline records the CPU, platform, Python and mongod versions and the run configuration next to the
+numbers; --compare refuses a baseline recorded with a different configuration.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import bcrypt
+import httpx
+from bson import Int64
+
+os.environ["MONGO_URL"] = os.environ.get("BENCH_MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "pixel_coders_bench")
+# Measure the handlers, not the limiters in front of them.
+for name in ("AUTH_RATE_PER_MINUTE", "AUTH_RATE_BURST", "LOAD_SHED_AUTH_LIMIT", "LOAD_SHED_WRITE_LIMIT",
+             "LOAD_SHED_READ_LIMIT"):
+    os.environ.setdefault(name, "1000000000")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+
+import server  # noqa: E402
+from tests.session_data_stub import create_session_data_app  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+BENCH_PASSWORD = "benchmark-password"
+FRESH_ROADMAP_ID = "bench_fresh"
+
+
+async def insert_batched(collection, docs, batch_size: int = 10_000):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+
+
+def synthetic_roadmap(roadmap_id: str, node_count: int, chained: bool) -> dict:
+    return {
+        "roadmap_id": roadmap_id,
+        "title": f"Benchmark {roadmap_id}",
+        "description": "Synthetic roadmap for endpoint benchmarks",
+        "difficulty": "Intermediate",
+        "estimated_time": "1 month",
+        "nodes": [
+            {
+                "id": f"node_{j:02d}",
+                "label": f"Node {j}",
+                "description": f"Synthetic node {j}",
+                "resources": [],
+                "prerequisites": [f"node_{j - 1:02d}"] if chained and j else [],
+            }
+            for j in range(node_count)
+        ],
+        "node_bits": {f"node_{j:02d}": j for j in range(node_count)},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def seed(args, rng: random.Random) -> dict:
+    db = server.db
+    await server.client.drop_database(db.name)
+    await server.apply_seed()
+
+    synthetic = [synthetic_roadmap(f"bench_roadmap_{r:02d}", 20, True) for r in range(args.roadmaps)]
+    await db.roadmaps.insert_many(synthetic + [synthetic_roadmap(FRESH_ROADMAP_ID, server.MAX_ROADMAP_NODES, False)])
+    node_counts = {roadmap["roadmap_id"]: len(roadmap["nodes"]) for roadmap in server.DEFAULT_ROADMAPS + synthetic}
+
+    now = datetime.now(timezone.utc).isoformat()
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    user_ids = [f"user_bench{i:08d}" for i in range(args.users)]
+
+    def users():
+        for i, user_id in enumerate(user_ids):
+            xp = int(rng.expovariate(1 / 250))
+            yield {
+                "user_id": user_id, "email": f"bench{i}@example.com", "name": f"Bench User {i}",
+                "password_hash": password_hash, "picture": None,
+                "xp": xp, "level": server.calculate_level_from_xp(xp), "created_at": now,
+            }
+
+    started_at = time.perf_counter()
+    await insert_batched(db.users, users())
+
+    per_user = max(1, args.progress // args.users)
+    if per_user > len(node_counts):
+        raise SystemExit(f"--progress/--users needs at least {per_user} roadmaps; raise --roadmaps")
+
+    def progress():
+        for user_id in user_ids:
+            for roadmap_id in rng.sample(sorted(node_counts), per_user):
+                yield {
+                    "progress_id": f"progress_{uuid.uuid4().hex[:12]}", "user_id": user_id, "roadmap_id": roadmap_id,
+                    "completed_mask": Int64(rng.getrandbits(node_counts[roadmap_id])), "last_updated": now,
+                }
+
+    await insert_batched(db.user_progress, progress())
+
+    achievement_ids = [achievement["achievement_id"] for achievement in server.DEFAULT_ACHIEVEMENTS]
+    session_users = user_ids[:args.session_users]
+    few, many = session_users[:len(session_users) // 2], session_users[len(session_users) // 2:]
+    few_set, many_set = set(few), set(many)
+
+    def user_achievements():
+        for user_id in user_ids:
+            if user_id in many_set:
+                earned = achievement_ids
+            elif user_id in few_set:
+                earned = achievement_ids[:1]
+            else:
+                earned = rng.sample(achievement_ids, rng.randint(0, 3))
+            for achievement_id in earned:
+                yield {
+                    "user_achievement_id": f"ua_{uuid.uuid4().hex[:12]}", "user_id": user_id,
+                    "achievement_id": achievement_id, "earned_at": now,
+                }
+
+    await insert_batched(db.user_achievements, user_achievements())
+    tokens = {user_id: await server.create_session(user_id) for user_id in session_users}
+    print(f"seeded {args.users} users, {args.users * per_user} progress rows in {time.perf_counter() - started_at:.1f}s")
+
+    return {
+        "roadmap_ids": sorted(node_counts),
+        "tokens": [tokens[user_id] for user_id in session_users],
+        "few": [tokens[user_id] for user_id in few],
+        "many": [tokens[user_id] for user_id in many],
+        "emails": [f"bench{i}@example.com" for i in range(args.session_users)],
+    }
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run_scenario(client: httpx.AsyncClient, method: str, route: str, make_request, requests: int,
+                       concurrency: int) -> dict:
+    label = f"{method} {route}"
+    before = server.http_request_db_commands.snapshot(label) or {"count": 0, "sum": 0}
+    indexes = iter(range(requests))
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            sent_at = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - sent_at)
+            if response.status_code >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    client.cookies.clear()
+
+    after = server.http_request_db_commands.snapshot(label) or {"count": 0, "sum": 0}
+    served = after["count"] - before["count"]
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "db_commands": (after["sum"] - before["sum"]) / served if served else 0.0,
+    }
+
+
+def build_scenarios(context: dict) -> list:
+    tokens, roadmap_ids = context["tokens"], context["roadmap_ids"]
+    run_id = uuid.uuid4().hex[:8]
+
+    def auth(i: int, pool: list = tokens) -> dict:
+        return {"Authorization": f"Bearer {pool[i % len(pool)]}"}
+
+    def fresh_node(i: int) -> tuple:
+        return tokens[i % len(tokens)], f"node_{i // len(tokens):02d}"
+
+    async def complete_node(client, i):
+        token, node_id = fresh_node(i)
+        return await client.post(
+            f"/api/progress/{FRESH_ROADMAP_ID}/complete-node", json={"node_id": node_id, "utc_offset_minutes": 0},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    return [
+        ("list_roadmaps", "GET", "/api/roadmaps", lambda c, i: c.get("/api/roadmaps")),
+        ("get_roadmap", "GET", "/api/roadmaps/{roadmap_id}",
+         lambda c, i: c.get(f"/api/roadmaps/{roadmap_ids[i % len(roadmap_ids)]}")),
+        ("list_achievements", "GET", "/api/achievements", lambda c, i: c.get("/api/achievements")),
+        ("register", "POST", "/api/auth/register", lambda c, i: c.post("/api/auth/register", json={
+            "email": f"new_{run_id}_{i}@example.com", "password": BENCH_PASSWORD, "name": f"New User {i}"})),
+        ("login", "POST", "/api/auth/login", lambda c, i: c.post("/api/auth/login", json={
+            "email": context["emails"][i % len(context["emails"])], "password": BENCH_PASSWORD})),
+        ("exchange_session", "POST", "/api/auth/session",
+         lambda c, i: c.post("/api/auth/session", json={"session_id": f"oauth_{run_id}_{i}"})),
+        ("get_me", "GET", "/api/auth/me", lambda c, i: c.get("/api/auth/me", headers=auth(i))),
+        ("get_progress", "GET", "/api/progress", lambda c, i: c.get("/api/progress", headers=auth(i))),
+        ("next_nodes", "GET", "/api/progress/{roadmap_id}/next", lambda c, i: c.get(
+            f"/api/progress/{roadmap_ids[i % len(roadmap_ids)]}/next", headers=auth(i))),
+        ("complete_node", "POST", "/api/progress/{roadmap_id}/complete-node", complete_node),
+        ("user_achievements_few", "GET", "/api/user-achievements",
+         lambda c, i: c.get("/api/user-achievements", headers=auth(i, context["few"]))),
+        ("user_achievements_many", "GET", "/api/user-achievements",
+         lambda c, i: c.get("/api/user-achievements", headers=auth(i, context["many"]))),
+        ("dashboard", "GET", "/api/dashboard", lambda c, i: c.get("/api/dashboard", headers=auth(i))),
+        ("leaderboard", "GET", "/api/leaderboard", lambda c, i: c.get("/api/leaderboard")),
+        ("leaderboard_me", "GET", "/api/leaderboard/me", lambda c, i: c.get("/api/leaderboard/me", headers=auth(i))),
+    ]
+
+
+CONFIG_KEYS = ("users", "progress", "roadmaps", "session_users", "requests", "concurrency", "seed")
+
+
+async def environment(args) -> dict:
+    cpu = platform.processor()
+    cpuinfo = Path("/proc/cpuinfo")
+    if cpuinfo.exists():
+        cpu = next((line.split(":", 1)[1].strip() for line in cpuinfo.read_text().splitlines()
+                    if line.startswith("model name")), cpu)
+    server_info = await server.client.server_info()
+    return {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "hardware": {"cpu": cpu, "cpu_count": os.cpu_count(), "platform": platform.platform()},
+        "software": {"python": platform.python_version(), "mongod": server_info.get("version")},
+        "config": {key: getattr(args, key) for key in CONFIG_KEYS},
+    }
+
+
+def load_baseline(path: Path) -> dict:
+    if not path.exists():
+        raise SystemExit(f"No baseline at {path}: record one on the reference machine with --save-baseline")
+    baseline = json.loads(path.read_text())
+    if "scenarios" not in baseline or "environment" not in baseline:
+        raise SystemExit(f"{path} is not a baseline written by --save-baseline; re-record it")
+    return baseline
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {base['p99_ms']:.2f} -> {result['p99_ms']:.2f} ms")
+        if result["rps"] < base["rps"] / (1 + tolerance):
+            regressions.append(f"{name}: throughput {base['rps']:.1f} -> {result['rps']:.1f} req/s")
+        if result["db_commands"] > base["db_commands"] + 1e-9:
+            regressions.append(f"{name}: mongo commands {base['db_commands']:.2f} -> {result['db_commands']:.2f} per request")
+    return regressions
+
+
+async def run(args) -> int:
+    if "bench" not in server.db.name:
+        raise SystemExit(f"Refusing to drop {server.db.name!r}: BENCH_DB_NAME must contain 'bench'")
+    baseline = load_baseline(args.baseline) if args.compare else None
+    config = {key: getattr(args, key) for key in CONFIG_KEYS}
+    if baseline and baseline["environment"]["config"] != config:
+        raise SystemExit(f"Baseline was recorded with {baseline['environment']['config']}, this run uses {config}; "
+                         "numbers are not comparable")
+    rng = random.Random(args.seed)
+    context = await seed(args, rng)
+    await server.initialize_data()
+    await server.rebuild_xp_ranking()
+    await server.session_data_client.start(httpx.ASGITransport(app=create_session_data_app()))
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, method, route, make_request in build_scenarios(context):
+            if args.only and name not in args.only:
+                continue
+            requests = args.requests
+            if name in ("register", "login", "exchange_session"):
+                requests = max(1, requests // 10)
+            if name == "complete_node":
+                requests = min(requests, len(context["tokens"]) * server.MAX_ROADMAP_NODES)
+            result = results[name] = await run_scenario(client, method, route, make_request, requests, args.concurrency)
+            print(f"{name:<24} {result['rps']:9.1f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+                  f"p99 {result['p99_ms']:8.2f} ms  {result['db_commands']:5.2f} cmds/req  errors {result['errors']}")
+    recorded = await environment(args)
+    await server.shutdown_db_client()
+
+    failures = []
+    if "user_achievements_few" in results and "user_achievements_many" in results:
+        if results["user_achievements_few"]["db_commands"] != results["user_achievements_many"]["db_commands"]:
+            failures.append("user-achievements mongo commands grow with the number of achievements")
+    failures.extend(f"{name}: {result['errors']} error responses" for name, result in results.items() if result["errors"])
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({"environment": recorded, "scenarios": results}, indent=2,
+                                            sort_keys=True) + "\n")
+        print(f"saved baseline to {args.baseline}")
+    if baseline:
+        if baseline["environment"]["hardware"] != recorded["hardware"]:
+            print(f"WARN baseline was recorded on {baseline['environment']['hardware']}")
+        failures.extend(compare(results, baseline, args.tolerance))
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint benchmarks against a local mongod")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--progress", type=int, default=1_000_000, help="total user_progress rows")
+    parser.add_argument("--roadmaps", type=int, default=20, help="synthetic roadmaps added to the seed catalog")
+    parser.add_argument("--session-users", type=int, default=1_000, help="users with a live session")
+    parser.add_argument("--requests", type=int, default=2_000, help="requests per scenario (auth scenarios run a tenth)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed latency/throughput drift")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+
+from server import XpRanking  # noqa: E402
+
+
+def timed(label: str, operations: int, fn):
+    started_at = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started_at
+    print(f"{label:<28} {elapsed:8.3f}s  {elapsed / operations * 1e6:8.2f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XP ranking micro-benchmark")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--operations", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    user_ids = [f"user_{i:012x}" for i in range(args.users)]
+    entries = [(user_id, int(rng.expovariate(1 / 250))) for user_id in user_ids]
+    ranking = XpRanking()
+
+    timed("rebuild", args.users, lambda: ranking.rebuild(entries))
+
+    sampled = [rng.choice(user_ids) for _ in range(args.operations)]
+    xp_by_user = dict(entries)
+
+    def apply_updates():
+        for user_id in sampled:
+            xp_by_user[user_id] += 10
+            ranking.update(user_id, xp_by_user[user_id])
+
+    timed("incremental update (+10 xp)", args.operations, apply_updates)
+
+    probes = [xp_by_user[user_id] for user_id in sampled]
+    timed("rank lookup", args.operations, lambda: [ranking.rank(xp) for xp in probes])
+
+    top_xp = max(xp_by_user.values())
+    print(f"users={len(ranking)} top_xp={top_xp} rank(top)={ranking.rank(top_xp)} rank(0)={ranking.rank(0)}")
+
+
+if __name__ == "__main__":
+    main()
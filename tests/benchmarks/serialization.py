@@ -0,0 +1,81 @@
+import argparse
+import gzip
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+
+import server  # noqa: E402
+
+
+def per_op(operations: int, fn) -> float:
+    started_at = time.perf_counter()
+    for _ in range(operations):
+        fn()
+    return (time.perf_counter() - started_at) / operations * 1e6
+
+
+def build_payloads(rng: random.Random) -> dict:
+    now = "2025-01-01T00:00:00+00:00"
+    roadmaps = [dict(roadmap, created_at=now) for roadmap in server.DEFAULT_ROADMAPS] * 5
+    today = server.epoch_day(datetime.now(timezone.utc))
+    user_doc = {
+        "user_id": "user_0123456789ab", "email": "bench@example.com", "name": "Bench User", "picture": None,
+        "xp": 1230, "level": 13, "created_at": now,
+        "activity": {"last_day": today, "bits": rng.getrandbits(32), "streak": 4, "longest_streak": 9},
+    }
+    user = server.User(**user_doc)
+    progress = [
+        {
+            "progress_id": f"progress_{i:012x}", "user_id": user.user_id, "roadmap_id": roadmap["roadmap_id"],
+            "completed_nodes": [node["id"] for node in roadmap["nodes"] if rng.random() < 0.5],
+            "progress_percentage": 50.0, "last_updated": now,
+        }
+        for i, roadmap in enumerate(roadmaps * 4)
+    ]
+    achievements = [{**achievement, "earned_at": now} for achievement in server.DEFAULT_ACHIEVEMENTS]
+    return {
+        "get_me": (user_doc, user),
+        "roadmaps": roadmaps,
+        "progress_page": progress[:100],
+        "dashboard": {"user": server.user_payload(user), "progress": progress[:25], "achievements": achievements},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization and compression micro-benchmark")
+    parser.add_argument("--operations", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    payloads = build_payloads(random.Random(args.seed))
+    stdlib = JSONResponse(content=None)
+
+    user_doc, user = payloads.pop("get_me")
+    old_path = {"get_me": lambda: stdlib.render(jsonable_encoder(server.user_payload(server.User(**user_doc))))}
+    new_path = {"get_me": lambda: server.encode_json(server.user_payload(user))}
+    for name, content in payloads.items():
+        old_path[name] = lambda content=content: stdlib.render(jsonable_encoder(content))
+        new_path[name] = lambda content=content: server.encode_json(content)
+
+    print(f"{'payload':<14} {'stdlib us':>10} {'orjson us':>10} {'speedup':>8}  {'identity':>9} "
+          f"{'gzip-6':>8} {'gzip-9':>8} {'br-11':>8}  {'gzip-6 us':>9}")
+    for name in old_path:
+        old_us = per_op(args.operations, old_path[name])
+        new_us = per_op(args.operations, new_path[name])
+        body = new_path[name]()
+        gzip_us = per_op(max(1, args.operations // 10), lambda: gzip.compress(body, compresslevel=6))
+        br = len(server.brotli.compress(body, quality=11)) if server.brotli else "-"
+        print(f"{name:<14} {old_us:10.1f} {new_us:10.1f} {old_us / new_us:7.1f}x  {len(body):9} "
+              f"{len(gzip.compress(body, compresslevel=6)):8} {len(gzip.compress(body, compresslevel=9)):8} "
+              f"{br:>8}  {gzip_us:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from fastapi import FastAPI, Header, HTTPException
+
+SESSION_DATA_PATH = "/auth/v1/env/oauth/session-data"
+
+
+def create_session_data_app(sessions=None) -> FastAPI:
+    stub = FastAPI()
+
+    @stub.get(SESSION_DATA_PATH)
+    async def session_data(x_session_id: str = Header(...)):
+        if sessions is not None:
+            if x_session_id not in sessions:
+                raise HTTPException(status_code=404, detail="Unknown session")
+            return sessions[x_session_id]
+        return {
+            "id": x_session_id,
+            "email": f"{x_session_id}@example.com",
+            "name": f"User {x_session_id}",
+            "picture": None,
+            "session_token": f"session_{x_session_id}",
+        }
+
+    return stub
+
+
+app = create_session_data_app()
@@ -0,0 +1,125 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+import server  # noqa: E402
+
+ROUTE_LABEL = "GET /api/user-achievements"
+
+
+def matches(doc: dict, query: dict) -> bool:
+    for field, condition in query.items():
+        if isinstance(condition, dict):
+            if "$gt" in condition and not doc.get(field, "") > condition["$gt"]:
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+def record_command():
+    # Mirrors MongoCommandListener: every round trip counts against the current request.
+    stats = server.current_request_stats.get()
+    if stats is not None:
+        stats.db_commands += 1
+
+
+class FakeCursor:
+    def __init__(self, docs: list):
+        self.docs = docs
+
+    def sort(self, key, direction=None):
+        self.docs = sorted(self.docs, key=lambda doc: doc[key])
+        return self
+
+    def limit(self, count: int):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        record_command()
+        return self.docs[:length] if length else list(self.docs)
+
+    def __aiter__(self):
+        record_command()
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, docs: list):
+        self.docs = docs
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([dict(doc) for doc in self.docs if matches(doc, query or {})])
+
+    async def find_one(self, query=None, projection=None):
+        record_command()
+        return next((dict(doc) for doc in self.docs if matches(doc, query or {})), None)
+
+
+class FakeDatabase:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection([]))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    achievement_ids = [achievement["achievement_id"] for achievement in server.DEFAULT_ACHIEVEMENTS]
+    user_achievements = [
+        {"user_id": "user_one", "achievement_id": achievement_ids[0], "earned_at": "2025-01-01T00:00:00+00:00"},
+    ] + [
+        {"user_id": "user_many", "achievement_id": achievement_id, "earned_at": "2025-01-01T00:00:00+00:00"}
+        for achievement_id in achievement_ids
+    ]
+    monkeypatch.setattr(server, "db", FakeDatabase(
+        user_achievements=FakeCollection(user_achievements),
+        achievements=FakeCollection([dict(achievement) for achievement in server.DEFAULT_ACHIEVEMENTS]),
+    ))
+    monkeypatch.setattr(server.catalog, "achievements", {
+        achievement["achievement_id"]: achievement for achievement in server.DEFAULT_ACHIEVEMENTS
+    })
+
+    async def current_user(request):
+        user_id = request.headers["Authorization"].removeprefix("Bearer ")
+        return server.User(user_id=user_id, email=f"{user_id}@example.com", name=user_id, created_at="2025-01-01")
+
+    monkeypatch.setattr(server, "get_current_user", current_user)
+    return TestClient(server.app)
+
+
+def commands_for(client: TestClient, user_id: str) -> tuple:
+    before = server.http_request_db_commands.snapshot(ROUTE_LABEL) or {"count": 0, "sum": 0}
+    response = client.get("/api/user-achievements", headers={"Authorization": f"Bearer {user_id}"})
+    after = server.http_request_db_commands.snapshot(ROUTE_LABEL)
+    assert response.status_code == 200
+    assert after["count"] == before["count"] + 1
+    return len(response.json()), after["sum"] - before["sum"]
+
+
+def test_user_achievements_command_count_is_constant(client):
+    one_count, one_commands = commands_for(client, "user_one")
+    many_count, many_commands = commands_for(client, "user_many")
+
+    assert one_count == 1
+    assert many_count == len(server.DEFAULT_ACHIEVEMENTS)
+    assert one_commands == many_commands == 1
+
+
+def test_user_achievements_join_catalog_details(client):
+    response = client.get("/api/user-achievements", headers={"Authorization": "Bearer user_one"})
+
+    achievement = response.json()[0]
+    assert achievement["achievement_id"] == server.DEFAULT_ACHIEVEMENTS[0]["achievement_id"]
+    assert achievement["name"] == server.DEFAULT_ACHIEVEMENTS[0]["name"]
+    assert achievement["earned_at"] == "2025-01-01T00:00:00+00:00"